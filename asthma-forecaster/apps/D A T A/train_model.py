@@ -347,6 +347,8 @@ def main():
         {
             "model": model,
             "scaler": scaler,
+            # model was fit on scaler output; predictors must transform before predict_proba
+            "model_input": "scaled",
             "feature_order": feature_cols,
             "target_type": "risk_1_5" if target_col == "risk" else "flare_binary",
             "target_names": target_names,
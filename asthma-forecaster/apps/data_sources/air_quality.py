@@ -9,7 +9,7 @@ import os
 from datetime import date, timedelta
 from typing import Any
 
-import requests
+from .http import json_body, session
 
 
 AIRNOW_BASE = "https://www.airnowapi.org"
@@ -105,9 +105,9 @@ def pull_airnow(
         }
 
     try:
-        r = requests.get(url, params=params, timeout=15)
+        r = session().get(url, params=params, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = json_body(r)
     except Exception as e:
         return {
             "pm25_mean": None,
@@ -145,9 +145,9 @@ def pull_airnow(
     prev_date = target_date - timedelta(days=1)
     try:
         prev_params = {**params, "date": prev_date.isoformat()}
-        r_prev = requests.get(url, params=prev_params, timeout=15)
+        r_prev = session().get(url, params=prev_params, timeout=15)
         if r_prev.ok:
-            prev_data = r_prev.json() or []
+            prev_data = json_body(r_prev) or []
             if not isinstance(prev_data, list):
                 prev_data = [prev_data]
             prev_aqis = []
@@ -216,9 +216,9 @@ def pull_purpleair(
     headers = {"X-API-Key": read_key}
 
     try:
-        r = requests.get(url, params=params, headers=headers, timeout=15)
+        r = session().get(url, params=params, headers=headers, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = json_body(r)
     except Exception as e:
         return {
             "pm25_mean": None,
@@ -0,0 +1,32 @@
+"""
+Shared HTTP session and JSON decoding for the data sources.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=1)
+def session() -> requests.Session:
+    """Keep-alive session (pooled connections, retries on 429/5xx) shared by all source requests."""
+    s = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    s.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retries))
+    return s
+
+
+def json_body(response: requests.Response) -> Any:
+    """Decode a JSON response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
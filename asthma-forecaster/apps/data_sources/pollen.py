@@ -19,6 +19,8 @@ import re
 from datetime import date
 from typing import Any
 
+from .http import json_body, session
+
 OPENMETEO_AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
 
 # Houston Health Department (NAB Station 188) – real daily counts for Texas region
@@ -91,11 +93,9 @@ def _pull_nab_houston() -> dict[str, Any] | None:
     Returns tree_index, grass_index, weed_index (0–5) from real NAB data, or None on failure.
     Houston reports Mon–Fri; weekends/holidays may have no new report.
     """
-    import requests
-
     headers = {"User-Agent": USER_AGENT}
     try:
-        r = requests.get(HOUSTON_POLLEN_LISTING_URL, headers=headers, timeout=15)
+        r = session().get(HOUSTON_POLLEN_LISTING_URL, headers=headers, timeout=15)
         r.raise_for_status()
         html = r.text
     except Exception:
@@ -118,7 +118,7 @@ def _pull_nab_houston() -> dict[str, Any] | None:
         report_url = HOUSTON_POLLEN_LISTING_URL.rstrip("/") + "/" + report_path.lstrip("/")
 
     try:
-        r2 = requests.get(report_url, headers=headers, timeout=15)
+        r2 = session().get(report_url, headers=headers, timeout=15)
         r2.raise_for_status()
         page = r2.text
     except Exception:
@@ -202,8 +202,6 @@ def _pull_openmeteo_pollen(
     target_date: date,
 ) -> dict[str, Any]:
     """Open-Meteo Air Quality API: hourly pollen by lat/lon, aggregated to daily."""
-    import requests
-
     params = {
         "latitude": latitude,
         "longitude": longitude,
@@ -212,9 +210,9 @@ def _pull_openmeteo_pollen(
         "hourly": "alder_pollen,birch_pollen,grass_pollen,mugwort_pollen,olive_pollen,ragweed_pollen",
     }
     try:
-        r = requests.get(OPENMETEO_AIR_QUALITY_URL, params=params, timeout=15)
+        r = session().get(OPENMETEO_AIR_QUALITY_URL, params=params, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = json_body(r)
     except Exception as e:
         return {
             "tree_index": None,
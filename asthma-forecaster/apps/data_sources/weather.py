@@ -8,7 +8,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Any
 
-import requests
+from .http import json_body, session
 
 
 NWS_USER_AGENT = "(TIDAL2026, contact@example.com)"
@@ -16,9 +16,9 @@ NWS_USER_AGENT = "(TIDAL2026, contact@example.com)"
 
 def _nws_get(url: str) -> dict[str, Any] | None:
     try:
-        r = requests.get(url, headers={"User-Agent": NWS_USER_AGENT}, timeout=15)
+        r = session().get(url, headers={"User-Agent": NWS_USER_AGENT}, timeout=15)
         r.raise_for_status()
-        return r.json()
+        return json_body(r)
     except Exception:
         return None
 
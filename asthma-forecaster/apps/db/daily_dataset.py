@@ -254,5 +254,6 @@ def insert_many_daily_rows(pull_results: list[dict[str, Any]], *, coll: Collecti
         )
     if not ops:
         return 0
-    res = coll.bulk_write(ops)
+    # Upserts are independent (one per location/date), so let the server apply them in any order
+    res = coll.bulk_write(ops, ordered=False)
     return res.upserted_count + res.modified_count
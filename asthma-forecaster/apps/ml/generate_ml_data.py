@@ -97,19 +97,18 @@ def main():
     num_locs = len(locations)
     while current <= end:
         batch_end = min(current + timedelta(days=args.batch - 1), end)
-        results = []
-        d = current
-        while d <= batch_end:
-            for lat, lon, zip_code in locations:
-                result = pull_all(
-                    latitude=lat,
-                    longitude=lon,
-                    zip_code=zip_code,
-                    target_date=d,
-                    include_raw=False,
-                )
-                results.append(result)
-            d += timedelta(days=1)
+        days = [current + timedelta(days=i) for i in range((batch_end - current).days + 1)]
+        results = [
+            pull_all(
+                latitude=lat,
+                longitude=lon,
+                zip_code=zip_code,
+                target_date=d,
+                include_raw=False,
+            )
+            for d in days
+            for lat, lon, zip_code in locations
+        ]
         n = insert_many_daily_rows(results, coll=coll)
         total += n
         print(f"  {current} .. {batch_end}: {n} rows ({num_locs} locs)", file=sys.stderr)
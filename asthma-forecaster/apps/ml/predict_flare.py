@@ -13,44 +13,59 @@ Usage (from TIDAL2026):
 from __future__ import annotations
 
 import argparse
+import copy
+import itertools
 import json
 import os
 import sys
-from datetime import timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
+from typing import Callable
 
-# Bootstrap paths and .env
+# Resolved once: asthma-forecaster/apps and the TIDAL2026 root
+_APPS_DIR = Path(__file__).resolve().parent.parent
+_TIDAL_ROOT = _APPS_DIR.parent.parent
+_BOOTSTRAPPED = False
+
+
+# Bootstrap paths and .env (once per process)
 def _bootstrap():
+    global _BOOTSTRAPPED
+    if _BOOTSTRAPPED:
+        return
+    _BOOTSTRAPPED = True
     try:
         from dotenv import load_dotenv
-        root = Path(__file__).resolve().parent.parent.parent.parent
-        for p in [root / ".env", Path.cwd() / ".env"]:
+        for p in [_TIDAL_ROOT / ".env", Path.cwd() / ".env"]:
             if p.exists():
                 load_dotenv(p)
                 break
     except ImportError:
         pass
-    tidal = Path(__file__).resolve().parent.parent.parent.parent
+    tidal = _TIDAL_ROOT
     if str(tidal) not in sys.path:
         sys.path.insert(0, str(tidal))
     if str(tidal / "asthma-forecaster") not in sys.path:
         sys.path.insert(0, str(tidal / "asthma-forecaster"))
 
 
-_bootstrap()
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        """Serialize to a JSON string (orjson; numpy scalars/arrays serialize natively)."""
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        """Serialize to a JSON string (stdlib fallback when orjson is not installed)."""
+        return json.dumps(obj)
 
-import numpy as np
-import pandas as pd
-import joblib
 
 # Flare model bundle path: D A T A/flare_model.joblib
 def _flare_model_path() -> Path | None:
-    root = Path(__file__).resolve().parent.parent.parent.parent
-    data_dir = root / "asthma-forecaster" / "apps" / "D A T A"
-    p = data_dir / "flare_model.joblib"
-    if p.exists():
-        return p
-    p = Path(__file__).resolve().parent.parent / "D A T A" / "flare_model.joblib"
+    p = _APPS_DIR / "D A T A" / "flare_model.joblib"
     if p.exists():
         return p
     return None
@@ -59,13 +74,19 @@ def _flare_model_path() -> Path | None:
 # Canonical encoding when bundle has no encoders (Monday=0 .. Sunday=6; winter=0, spring=1, summer=2, fall=3)
 DOW_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 SEASON_ORDER = ["winter", "spring", "summer", "fall"]
+DOW_MAP = {d: i for i, d in enumerate(DOW_ORDER)}
+SEASON_MAP = {s: i for i, s in enumerate(SEASON_ORDER)}
+
+
+def _is_nan(v) -> bool:
+    """True for None or float NaN (NaN is the only value that is not equal to itself)."""
+    return v is None or (isinstance(v, float) and v != v)
 
 
-def _row_to_flare_features(row: pd.Series, feature_order: list[str], le_dow=None, le_season=None) -> pd.DataFrame:
-    """Build one-row DataFrame in flare model feature space."""
-    exclude = {"date", "locationid", "zip_code", "flare_day"}
+def _encode_flare_row(row: pd.Series, le_dow=None, le_season=None) -> dict:
+    """Encode one row's categorical/flag fields into flare model feature space."""
     out = row.to_dict()
-    if "day_of_week" in out and out["day_of_week"] is not None:
+    if not _is_nan(out.get("day_of_week")):
         v = out["day_of_week"]
         if isinstance(v, (int, float)):
             s = DOW_ORDER[int(v) % 7]
@@ -75,12 +96,12 @@ def _row_to_flare_features(row: pd.Series, feature_order: list[str], le_dow=None
             try:
                 out["day_of_week"] = le_dow.transform([s])[0]
             except Exception:
-                out["day_of_week"] = DOW_ORDER.index(s) if s in DOW_ORDER else 0
+                out["day_of_week"] = DOW_MAP.get(s, 0)
         else:
-            out["day_of_week"] = DOW_ORDER.index(s) if s in DOW_ORDER else 0
+            out["day_of_week"] = DOW_MAP.get(s, 0)
     else:
         out["day_of_week"] = 0
-    if "season" in out and out["season"] is not None:
+    if not _is_nan(out.get("season")):
         v = out["season"]
         if isinstance(v, (int, float)):
             s = SEASON_ORDER[int(v) % 4]
@@ -90,60 +111,139 @@ def _row_to_flare_features(row: pd.Series, feature_order: list[str], le_dow=None
             try:
                 out["season"] = le_season.transform([s])[0]
             except Exception:
-                out["season"] = SEASON_ORDER.index(s) if s in SEASON_ORDER else 0
+                out["season"] = SEASON_MAP.get(s, 0)
         else:
-            out["season"] = SEASON_ORDER.index(s) if s in SEASON_ORDER else 0
+            out["season"] = SEASON_MAP.get(s, 0)
     else:
         out["season"] = 0
-    if out.get("holiday_flag") is None:
-        out["holiday_flag"] = 0
-    out["holiday_flag"] = int(out["holiday_flag"]) if out.get("holiday_flag") is not None else 0
-    # Ensure google_trends_allergy if expected
-    if "google_trends_allergy" not in out or (out.get("google_trends_allergy") is None or (isinstance(out.get("google_trends_allergy"), float) and np.isnan(out["google_trends_allergy"]))):
-        out["google_trends_allergy"] = 0.0
-    df = pd.DataFrame([out])
-    for c in feature_order:
-        if c not in df.columns:
-            df[c] = 0
-    X = df[feature_order].copy()
-    X = X.fillna(0).astype(float)
-    return X
-
-
-def _proba_to_score_level(proba: float) -> tuple[float, str, str]:
-    if proba < 0.2:
-        return (1 + proba * 5, "low", "Low")
-    if proba < 0.5:
-        return (2 + (proba - 0.2) * 10, "moderate", "Moderate")
-    return (4 + (proba - 0.5) * 2, "high", "High")
-
-
-def _active_risk_factors(row: pd.Series) -> list[dict]:
-    factors = []
-    if row.get("AQI") is not None and float(row["AQI"]) >= 101:
-        factors.append({"id": "air", "label": "Poor Air Quality", "iconKey": "wind"})
-    if row.get("PM2_5_mean") is not None and float(row["PM2_5_mean"]) >= 35:
-        factors.append({"id": "pm25", "label": "High PM2.5", "iconKey": "wind"})
-    pollen = (row.get("pollen_tree") or 0) + (row.get("pollen_grass") or 0) + (row.get("pollen_weed") or 0)
-    if pollen >= 8:
-        factors.append({"id": "pollen", "label": "High Pollen", "iconKey": "sprout"})
-    if not factors:
-        factors.append({"id": "general", "label": "Environmental conditions", "iconKey": "wind"})
+    out["holiday_flag"] = 0 if _is_nan(out.get("holiday_flag")) else int(out["holiday_flag"])
+    return out
+
+
+def _feature_template(bundle: dict) -> dict[str, float]:
+    """Every model feature defaulted to 0.0, in feature_order; built once per bundle."""
+    if "_template" not in bundle:
+        bundle["_template"] = {c: 0.0 for c in bundle.get("feature_order") or []}
+    return bundle["_template"]
+
+
+def _rows_to_flare_features(encoded: list[dict], template: dict[str, float]) -> pd.DataFrame:
+    """Build an (n_rows, n_features) DataFrame in flare model feature order."""
+    import pandas as pd
+    rows = []
+    for enc in encoded:
+        # Missing features (e.g. google_trends_allergy) keep their template default
+        out = dict(template)
+        out.update({k: v for k, v in enc.items() if k in template})
+        rows.append(out)
+    X = pd.DataFrame(rows, columns=list(template))
+    return X.fillna(0).astype(float)
+
+
+# Class-name markers for tree ensembles, whose splits are invariant to per-feature scaling
+_TREE_MODEL_MARKERS = ("Forest", "Boosting", "Tree", "XGB", "LGBM", "CatBoost")
+
+
+def _prepare_bundle(bundle: dict) -> dict:
+    """One-time, in-place adjustments to a freshly loaded bundle."""
+    # A tree model fit on raw features never needs the scaler. Only skip it when the bundle says so:
+    # D A T A/train_model.py fits the forest on *scaled* features ("model_input": "scaled"), so its
+    # thresholds live in scaled space and bundles without the key must keep the transform.
+    model_name = type(bundle.get("model")).__name__
+    bundle["_skip_scaler"] = (
+        bundle.get("model_input") == "raw" and any(m in model_name for m in _TREE_MODEL_MARKERS)
+    )
+    _feature_template(bundle)
+    return bundle
+
+
+def _load_predictor(bundle: dict) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Return a callable mapping a feature matrix to positive-class probabilities.
+    Uses a Treelite-compiled library when the bundle names one (bundle["treelite_so"]) and
+    treelite_runtime is installed; otherwise falls back to model.predict_proba.
+    """
+    import numpy as np
+    if "_predictor" in bundle:
+        return bundle["_predictor"]
+    model = bundle.get("model")
+    predictor = None
+    so_path = bundle.get("treelite_so")
+    if so_path and Path(so_path).exists():
+        try:
+            import treelite_runtime
+            # nthread=1: a week is at most 14 rows, so row-parallelism only adds thread overhead
+            compiled = treelite_runtime.Predictor(str(so_path), nthread=1)
+
+            def predictor(X):
+                out = np.asarray(compiled.predict(treelite_runtime.DMatrix(np.asarray(X))))
+                return out[:, 1] if out.ndim == 2 else out
+        except Exception:
+            predictor = None
+    if predictor is None:
+        def predictor(X):
+            return model.predict_proba(X)[:, 1]
+    bundle["_predictor"] = predictor
+    return predictor
+
+
+def _proba_to_score_level_vec(probas: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Map probabilities to 1-5 scores and low/moderate/high levels and labels (element-wise)."""
+    import numpy as np
+    probas = np.asarray(probas, dtype=np.float64)
+    low = probas < 0.2
+    moderate = probas < 0.5
+    score = np.where(low, 1 + probas * 5, np.where(moderate, 2 + (probas - 0.2) * 10, 4 + (probas - 0.5) * 2))
+    level = np.select([low, moderate], ["low", "moderate"], "high")
+    label = np.select([low, moderate], ["Low", "Moderate"], "High")
+    return score, level, label
+
+
+_AIR_FACTOR = {"id": "air", "label": "Poor Air Quality", "iconKey": "wind"}
+_PM25_FACTOR = {"id": "pm25", "label": "High PM2.5", "iconKey": "wind"}
+_POLLEN_FACTOR = {"id": "pollen", "label": "High Pollen", "iconKey": "sprout"}
+_GENERAL_FACTOR = {"id": "general", "label": "Environmental conditions", "iconKey": "wind"}
+
+
+def _active_risk_factors_vec(rows: list[pd.Series]) -> list[list[dict]]:
+    """Risk factors for each row, evaluated as boolean masks over all rows at once."""
+    import numpy as np
+    import pandas as pd
+    keys = ["AQI", "PM2_5_mean", "pollen_tree", "pollen_grass", "pollen_weed"]
+    frame = pd.DataFrame([[row.get(k) for k in keys] for row in rows], columns=keys, dtype="float64")
+    aqi = frame["AQI"].to_numpy()
+    pm25 = frame["PM2_5_mean"].to_numpy()
+    pollen = frame[["pollen_tree", "pollen_grass", "pollen_weed"]].fillna(0).sum(axis=1).to_numpy()
+    air_mask = aqi >= 101
+    pm25_mask = pm25 >= 35
+    pollen_mask = pollen >= 8
+    general_mask = ~(air_mask | pm25_mask | pollen_mask)
+
+    factors: list[list[dict]] = [[] for _ in rows]
+    for mask, factor in (
+        (air_mask, _AIR_FACTOR),
+        (pm25_mask, _PM25_FACTOR),
+        (pollen_mask, _POLLEN_FACTOR),
+        (general_mask, _GENERAL_FACTOR),
+    ):
+        for i in np.flatnonzero(mask):
+            factors[i].append(dict(factor))
     return factors
 
 
 def _synthetic_row_for_date(
-    target_d: pd.Timestamp,
+    target_d: date | pd.Timestamp,
     location_id: str | None = None,
     lat: float = 37.0,
     lon: float = -122.0,
 ) -> pd.Series:
     """Build one row for a single date so the model gets date-specific features (different score per day)."""
+    import pandas as pd
     lid = location_id or f"{lat:.2f}_{lon:.2f}"
     d = target_d.date() if hasattr(target_d, "date") else target_d
     dow = d.weekday()
     month = d.month
-    # 0=winter, 1=spring, 2=summer, 3=fall for SEASON_ORDER in _row_to_flare_features
+    # 0=winter, 1=spring, 2=summer, 3=fall for SEASON_ORDER in _encode_flare_row
     season = ((month % 12 + 3) // 3) - 1
     j = (d.toordinal() % 7) / 7.0
     aqi = 40 + int(30 * j)
@@ -175,71 +275,178 @@ def _synthetic_row_for_date(
     })
 
 
-def _predict_one_date(
-    date_str: str,
-    raw: pd.DataFrame,
-    bundle: dict,
-    location_id: str | None,
-) -> dict:
-    """Predict flare risk for one date; raw must have date column (datetime). Returns API-shaped dict."""
-    model = bundle.get("model")
-    scaler = bundle.get("scaler")
-    feature_order = bundle.get("feature_order") or []
-    le_dow = bundle.get("le_dow")
-    le_season = bundle.get("le_season")
+# Synthetic-row predictions are a pure function of (date, location, lat, lon, bundle), so overlapping
+# week requests in the same process can reuse them. Bounded LRU: most recently used entries last.
+_PREDICTION_CACHE: OrderedDict[tuple, dict] = OrderedDict()
+_PREDICTION_CACHE_SIZE = 1024
+_BUNDLE_IDS = itertools.count()
+
+
+def _bundle_id(bundle: dict) -> int:
+    """Process-unique id for a loaded bundle (stored on the bundle so it is never reused)."""
+    if "_bundle_id" not in bundle:
+        bundle["_bundle_id"] = next(_BUNDLE_IDS)
+    return bundle["_bundle_id"]
+
+
+def _cache_get(key: tuple) -> dict | None:
+    hit = _PREDICTION_CACHE.get(key)
+    if hit is None:
+        return None
+    _PREDICTION_CACHE.move_to_end(key)
+    return copy.deepcopy(hit)
+
+
+def _cache_put(key: tuple, value: dict) -> None:
+    _PREDICTION_CACHE[key] = copy.deepcopy(value)
+    _PREDICTION_CACHE.move_to_end(key)
+    while len(_PREDICTION_CACHE) > _PREDICTION_CACHE_SIZE:
+        _PREDICTION_CACHE.popitem(last=False)
 
-    raw = raw.copy()
-    raw["date"] = pd.to_datetime(raw["date"])
-    target_d = pd.Timestamp(date_str).normalize()
-    raw_match = raw[raw["date"].dt.normalize() == target_d]
-    if raw_match.empty:
-        # Use a date-specific synthetic row so each day gets its own model prediction (not same score)
-        lat = float(raw["latitude"].iloc[-1]) if "latitude" in raw.columns and len(raw) else 37.0
-        lon = float(raw["longitude"].iloc[-1]) if "longitude" in raw.columns and len(raw) else -122.0
-        lid = str(raw["location_id"].iloc[-1]) if "location_id" in raw.columns and len(raw) else None
-        row = _synthetic_row_for_date(target_d, location_id=lid or location_id, lat=lat, lon=lon)
-    else:
-        row = raw_match.iloc[0].copy()
 
+def _prepare_row(row: pd.Series, feature_order: list[str]) -> pd.Series:
+    """Fill identifiers and missing model inputs on a selected/synthetic row (in place)."""
     if "location_id" in row.index and "locationid" not in row.index:
         row["locationid"] = row["location_id"]
     for k in ["PM2_5_mean", "PM2_5_max", "AQI", "temp_min", "temp_max", "humidity", "wind", "pressure", "rain",
               "pollen_tree", "pollen_grass", "pollen_weed", "day_of_week", "month", "season", "holiday_flag"]:
         if k not in row.index and k in feature_order:
             row[k] = 0
-    if "google_trends_allergy" in feature_order and "google_trends_allergy" not in row.index:
-        row["google_trends_allergy"] = 0.0
+    return row
+
+
+# Float fields of the daily dict, split around day_of_week/season to keep the API key order
+_DAILY_AIR_KEYS = ("AQI", "PM2_5_mean", "PM2_5_max")
+_DAILY_WEATHER_KEYS = (
+    "temp_min", "temp_max", "humidity", "wind", "pollen_tree", "pollen_grass", "pollen_weed",
+)
+
+
+def _opt_float(row: pd.Series, k: str) -> float | None:
+    """row[k] as float, or None when missing/NaN (one lookup per field)."""
+    v = row.get(k)
+    return None if _is_nan(v) else float(v)
 
-    X = _row_to_flare_features(row, feature_order, le_dow, le_season)
-    if scaler is not None:
-        X = scaler.transform(X)
-    proba = float(model.predict_proba(X)[0, 1])
-    score, level, label = _proba_to_score_level(proba)
 
+def _result_from_row(
+    date_str: str,
+    row: pd.Series,
+    score: float,
+    level: str,
+    label: str,
+    factors: list[dict],
+) -> dict:
+    """Build the API-shaped result for one day from its row and risk score."""
     daily = {
         "date": date_str,
         "location_id": str(row.get("location_id", row.get("locationid", ""))),
-        "AQI": float(row["AQI"]) if pd.notna(row.get("AQI")) else None,
-        "PM2_5_mean": float(row["PM2_5_mean"]) if pd.notna(row.get("PM2_5_mean")) else None,
-        "PM2_5_max": float(row["PM2_5_max"]) if pd.notna(row.get("PM2_5_max")) else None,
+        **{k: _opt_float(row, k) for k in _DAILY_AIR_KEYS},
         "day_of_week": str(row.get("day_of_week")) if row.get("day_of_week") is not None else None,
         "season": str(row.get("season")) if row.get("season") is not None else None,
-        "temp_min": float(row["temp_min"]) if pd.notna(row.get("temp_min")) else None,
-        "temp_max": float(row["temp_max"]) if pd.notna(row.get("temp_max")) else None,
-        "humidity": float(row["humidity"]) if pd.notna(row.get("humidity")) else None,
-        "wind": float(row["wind"]) if pd.notna(row.get("wind")) else None,
-        "pollen_tree": float(row.get("pollen_tree")) if pd.notna(row.get("pollen_tree")) else None,
-        "pollen_grass": float(row.get("pollen_grass")) if pd.notna(row.get("pollen_grass")) else None,
-        "pollen_weed": float(row.get("pollen_weed")) if pd.notna(row.get("pollen_weed")) else None,
+        **{k: _opt_float(row, k) for k in _DAILY_WEATHER_KEYS},
     }
     return {
         "date": date_str,
         "risk": {"score": round(score, 1), "level": level, "label": label},
-        "activeRiskFactors": _active_risk_factors(row),
+        "activeRiskFactors": factors,
         "daily": daily,
     }
 
 
+def _predict_rows(date_strs: list[str], rows: list[pd.Series], bundle: dict) -> list[dict]:
+    """Run the flare model once on all prepared rows (one per date). Returns API-shaped dicts."""
+    if not rows:
+        return []
+    scaler = bundle.get("scaler")
+    feature_order = bundle.get("feature_order") or []
+    le_dow = bundle.get("le_dow")
+    le_season = bundle.get("le_season")
+
+    rows = [_prepare_row(row, feature_order) for row in rows]
+    encoded = [_encode_flare_row(row, le_dow, le_season) for row in rows]
+    X = _rows_to_flare_features(encoded, _feature_template(bundle))
+    if scaler is not None and not bundle.get("_skip_scaler"):
+        X = scaler.transform(X)
+    probas = _load_predictor(bundle)(X)
+    scores, levels, labels = _proba_to_score_level_vec(probas)
+    factors = _active_risk_factors_vec(rows)
+    return [
+        _result_from_row(d, row, score, level, label, f)
+        for d, row, score, level, label, f in zip(
+            date_strs, rows, scores.tolist(), levels.tolist(), labels.tolist(), factors
+        )
+    ]
+
+
+def _index_by_date(raw: pd.DataFrame) -> dict[date, int]:
+    """Map each calendar date to the position of its first row in raw (one pass over raw)."""
+    import numpy as np
+    import pandas as pd
+    if raw.empty:
+        return {}
+    norm = pd.to_datetime(raw["date"]).dt.normalize()
+    first = ~norm.duplicated()
+    return dict(zip(norm[first].dt.date, np.flatnonzero(first.to_numpy()).tolist()))
+
+
+def _predict_dates(
+    dates: list[date],
+    raw: pd.DataFrame,
+    bundle: dict,
+    location_id: str | None,
+) -> list[dict]:
+    """Predict flare risk for several dates with one batched model call; raw must have a date column."""
+    raw_by_date = _index_by_date(raw)
+    # Location of the latest env row; used for synthetic rows on dates without data
+    lat = float(raw["latitude"].iloc[-1]) if "latitude" in raw.columns and len(raw) else 37.0
+    lon = float(raw["longitude"].iloc[-1]) if "longitude" in raw.columns and len(raw) else -122.0
+    lid = str(raw["location_id"].iloc[-1]) if "location_id" in raw.columns and len(raw) else None
+    lid = lid or location_id
+    bid = _bundle_id(bundle)
+
+    results: list[dict | None] = [None] * len(dates)
+    pending: list[tuple[int, str, pd.Series, tuple | None]] = []
+    for i, target_d in enumerate(dates):
+        date_str = target_d.isoformat()
+        pos = raw_by_date.get(target_d)
+        if pos is not None:
+            pending.append((i, date_str, raw.iloc[pos].copy(), None))
+            continue
+        # Use a date-specific synthetic row so each day gets its own model prediction (not same score)
+        key = (date_str, lid, lat, lon, bid)
+        cached = _cache_get(key)
+        if cached is not None:
+            results[i] = cached
+            continue
+        pending.append((i, date_str, _synthetic_row_for_date(target_d, location_id=lid, lat=lat, lon=lon), key))
+
+    predicted = _predict_rows([p[1] for p in pending], [p[2] for p in pending], bundle)
+    for (i, _, _, key), out in zip(pending, predicted):
+        if key is not None:
+            _cache_put(key, out)
+        results[i] = out
+    return results
+
+
+def _predict_one_date(
+    date_str: str,
+    raw: pd.DataFrame,
+    bundle: dict,
+    location_id: str | None,
+) -> dict:
+    """Predict flare risk for one date; raw must have date column (datetime). Returns API-shaped dict."""
+    return _predict_dates([date.fromisoformat(date_str)], raw, bundle, location_id)[0]
+
+
+def _fetch_week_raw(lat: float, lon: float, start_d: date, days: int) -> pd.DataFrame | None:
+    """Week of env data from the APIs (AirNow, NOAA, ...); None when the fetch fails."""
+    try:
+        from apps.ml.week_data import fetch_week_dataframe
+        return fetch_week_dataframe(latitude=lat, longitude=lon, start_date=start_d, days=days)
+    except Exception:
+        return None
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Predict flare risk for a date or week; output JSON for risk API")
     parser.add_argument("--date", help="YYYY-MM-DD (required if not --week)")
@@ -251,77 +458,77 @@ def main() -> None:
     parser.add_argument("--lon", type=float, default=None, help="Longitude for API week data (with --lat fetches week via API keys)")
     args = parser.parse_args()
 
-    if args.location_id:
-        os.environ["LOCATION_ID"] = args.location_id
-
     if args.week:
         start_str = (args.start or "").strip()
         if len(start_str) != 10 or start_str[4] != "-" or start_str[7] != "-":
-            print(json.dumps({"error": "With --week provide --start YYYY-MM-DD"}), file=sys.stderr)
+            print(_dumps({"error": "With --week provide --start YYYY-MM-DD"}), file=sys.stderr)
             sys.exit(1)
+    else:
+        date_str = (args.date or "").strip()
+        if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+            print(_dumps({"error": "Provide --date YYYY-MM-DD or --week --start YYYY-MM-DD"}), file=sys.stderr)
+            sys.exit(1)
+
+    # .env and the heavy imports (pandas alone is ~0.5s) only once the arguments are usable,
+    # so --help and usage errors return immediately
+    _bootstrap()
+    import joblib
+
+    if args.location_id:
+        os.environ["LOCATION_ID"] = args.location_id
+
+    if args.week:
         days = max(1, min(args.days, 14))
         bundle_path = _flare_model_path()
         if not bundle_path or not bundle_path.exists():
-            print(json.dumps({"error": "Flare model not found (D A T A/flare_model.joblib)"}), file=sys.stderr)
+            print(_dumps({"error": "Flare model not found (D A T A/flare_model.joblib)"}), file=sys.stderr)
             sys.exit(1)
+        start_d = date.fromisoformat(start_str)
+        # Model load (disk/CPU) and API week fetch (network) are independent: overlap them.
+        # Prefer week data from API (--lat/--lon) when provided.
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_bundle = ex.submit(joblib.load, bundle_path)
+            fut_raw = None
+            if args.lat is not None and args.lon is not None:
+                fut_raw = ex.submit(_fetch_week_raw, args.lat, args.lon, start_d, days)
         try:
-            bundle = joblib.load(bundle_path)
+            bundle = fut_bundle.result()
         except Exception as e:
-            print(json.dumps({"error": f"Failed to load flare model: {e!s}"}), file=sys.stderr)
+            print(_dumps({"error": f"Failed to load flare model: {e!s}"}), file=sys.stderr)
             sys.exit(1)
         if not bundle.get("model") or not bundle.get("feature_order"):
-            print(json.dumps({"error": "Invalid flare model bundle"}), file=sys.stderr)
+            print(_dumps({"error": "Invalid flare model bundle"}), file=sys.stderr)
             sys.exit(1)
-        # Prefer week data from API (--lat/--lon) when provided
-        raw = None
-        if args.lat is not None and args.lon is not None:
-            try:
-                from apps.ml.week_data import fetch_week_dataframe
-                start_d = pd.Timestamp(start_str).date()
-                raw = fetch_week_dataframe(
-                    latitude=args.lat,
-                    longitude=args.lon,
-                    start_date=start_d,
-                    days=days,
-                )
-            except Exception:
-                pass
+        _prepare_bundle(bundle)
+        raw = fut_raw.result() if fut_raw is not None else None
         if raw is None or raw.empty:
             try:
                 from apps.ml.trainingModel import read_env_from_mongo
                 raw = read_env_from_mongo()
             except Exception:
                 from apps.ml.predict_risk import _synthetic_raw
-                end_d = pd.Timestamp(start_str).date() + timedelta(days=days - 1)
+                end_d = start_d + timedelta(days=days - 1)
                 raw = _synthetic_raw(end_d.strftime("%Y-%m-%d"), num_days=14 + days, location_id=args.location_id or "default")
-        results = []
-        start_d = pd.Timestamp(start_str).date()
-        for i in range(days):
-            d = start_d + timedelta(days=i)
-            date_str = d.strftime("%Y-%m-%d")
-            results.append(_predict_one_date(date_str, raw, bundle, args.location_id))
-        print(json.dumps({"start": start_str, "days": results}), flush=True)
+        dates = [start_d + timedelta(days=i) for i in range(days)]
+        results = _predict_dates(dates, raw, bundle, args.location_id)
+        print(_dumps({"start": start_str, "days": results}), flush=True)
         return
 
-    date_str = (args.date or "").strip()
-    if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
-        print(json.dumps({"error": "Provide --date YYYY-MM-DD or --week --start YYYY-MM-DD"}), file=sys.stderr)
-        sys.exit(1)
-
     bundle_path = _flare_model_path()
     if not bundle_path or not bundle_path.exists():
-        print(json.dumps({"error": "Flare model not found (D A T A/flare_model.joblib)"}), file=sys.stderr)
+        print(_dumps({"error": "Flare model not found (D A T A/flare_model.joblib)"}), file=sys.stderr)
         sys.exit(1)
 
     try:
         bundle = joblib.load(bundle_path)
     except Exception as e:
-        print(json.dumps({"error": f"Failed to load flare model: {e!s}"}), file=sys.stderr)
+        print(_dumps({"error": f"Failed to load flare model: {e!s}"}), file=sys.stderr)
         sys.exit(1)
 
     if not bundle.get("model") or not bundle.get("feature_order"):
-        print(json.dumps({"error": "Invalid flare model bundle (missing model or feature_order)"}), file=sys.stderr)
+        print(_dumps({"error": "Invalid flare model bundle (missing model or feature_order)"}), file=sys.stderr)
         sys.exit(1)
+    _prepare_bundle(bundle)
 
     try:
         from apps.ml.trainingModel import read_env_from_mongo
@@ -331,7 +538,7 @@ def main() -> None:
         raw = _synthetic_raw(date_str, location_id=args.location_id or "default")
 
     out = _predict_one_date(date_str, raw, bundle, args.location_id)
-    print(json.dumps(out), flush=True)
+    print(_dumps(out), flush=True)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,10 @@ Outputs JSON to stdout for consumption by the Next.js API.
 Usage (from TIDAL2026):
   PYTHONPATH=asthma-forecaster python3 -m apps.ml.predict_risk --date 2026-02-07
   PYTHONPATH=asthma-forecaster python3 -m apps.ml.predict_risk --week --start 2026-02-08 --days 7
+
+Long-lived worker (model and features stay loaded between requests):
+  PYTHONPATH=asthma-forecaster python3 -m apps.ml.predict_risk --serve
+  then write one JSON request per line to stdin, e.g. {"week": true, "start": "2026-02-08", "days": 7}
 """
 from __future__ import annotations
 
@@ -14,31 +18,48 @@ import json
 import os
 import sys
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 
 # Load .env and add project paths
+DOTENV_FLAG = "_TIDAL_DOTENV_LOADED"
+
+
 def _bootstrap():
-    try:
-        from dotenv import load_dotenv
-        root = Path(__file__).resolve().parent.parent.parent.parent
-        for p in [root / ".env", Path.cwd() / ".env"]:
-            if p.exists():
-                load_dotenv(p)
-                break
-    except ImportError:
-        pass
     tidal = Path(__file__).resolve().parent.parent.parent.parent
-    if str(tidal) not in sys.path:
-        sys.path.insert(0, str(tidal))
-    if str(tidal / "asthma-forecaster") not in sys.path:
-        sys.path.insert(0, str(tidal / "asthma-forecaster"))
+    # .env is loaded once per process tree (children inherit the env); later modules skip the lookups
+    if not os.environ.get(DOTENV_FLAG):
+        os.environ[DOTENV_FLAG] = "1"
+        try:
+            from dotenv import load_dotenv
+            for p in [tidal / ".env", Path.cwd() / ".env"]:
+                if p.exists():
+                    load_dotenv(p)
+                    break
+        except ImportError:
+            pass
+    for p in (str(tidal), str(tidal / "asthma-forecaster")):
+        if p not in sys.path:
+            sys.path.insert(0, p)
 
 
 _bootstrap()
 
+import numpy as np
 import pandas as pd
 import joblib
 
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        """Serialize to a JSON string (orjson; numpy scalars/arrays serialize natively)."""
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        """Serialize to a JSON string (stdlib fallback when orjson is not installed)."""
+        return json.dumps(obj)
+
 # Thresholds (must match trainingModel; used for activeRiskFactors)
 AQI_HIGH = float(os.getenv("AQI_HIGH", "101"))
 PM25_HIGH = float(os.getenv("PM25_HIGH", "35"))
@@ -51,53 +72,56 @@ DAILY_KEYS = (
 )
 
 
-def _daily_doc_from_row(row: pd.Series, date_str: str) -> dict:
-    """Build calendar daily document (same shape as MongoDB doc) for API."""
-    doc = {"date": date_str}
-    for k in DAILY_KEYS:
-        if k == "date":
-            continue
-        v = row.get(k)
-        if pd.isna(v):
-            doc[k] = None
-        elif hasattr(v, "isoformat"):
-            doc[k] = v.isoformat()[:10] if hasattr(v, "date") else str(v)
-        elif isinstance(v, (pd.Timestamp,)):
-            doc[k] = v.isoformat()[:10] if pd.notna(v) else None
-        elif hasattr(v, "item"):  # numpy scalar
+DOW_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+SEASON_NAMES = ("winter", "spring", "summer", "fall")
+# Direct lookups for the usual integer codes (3.0 hashes like 3); other values fall back to int() % n
+DOW_BY_CODE = dict(enumerate(DOW_NAMES))
+SEASON_BY_CODE = {i: SEASON_NAMES[i % 4] for i in range(5)}  # stored as 0-3 or 1-4
+
+
+def _daily_docs_from_frame(df: pd.DataFrame, date_strs: list[str]) -> list[dict]:
+    """Build calendar daily documents (same shape as MongoDB doc) for API, one per row of df."""
+    cols = [k for k in DAILY_KEYS if k != "date"]
+    sub = df.reindex(columns=cols)
+    for c in cols:
+        if pd.api.types.is_datetime64_any_dtype(sub[c]):
+            sub[c] = sub[c].dt.strftime("%Y-%m-%d")
+    sub = sub.astype(object).where(sub.notna(), None)
+    docs = []
+    for date_str, rec in zip(date_strs, sub.to_dict(orient="records")):
+        dow = rec["day_of_week"]
+        if dow is not None:
             try:
-                doc[k] = v.item()
-            except (ValueError, AttributeError):
-                doc[k] = float(v) if isinstance(v, (float,)) else int(v)
-        else:
-            doc[k] = v
-    if "day_of_week" in row and row.get("day_of_week") is not None:
-        try:
-            dow = int(row["day_of_week"])
-            doc["day_of_week"] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"][dow % 7]
-        except (TypeError, ValueError):
-            pass
-    if "season" in doc and doc.get("season") is not None and isinstance(doc["season"], (int, float)):
-        try:
-            doc["season"] = ["winter", "spring", "summer", "fall"][int(doc["season"]) % 4]
-        except (TypeError, ValueError, IndexError):
-            pass
-    return doc
+                rec["day_of_week"] = DOW_BY_CODE.get(dow) or DOW_NAMES[int(dow) % 7]
+            except (TypeError, ValueError):
+                pass
+        season = rec["season"]
+        if isinstance(season, (int, float)):
+            rec["season"] = SEASON_BY_CODE.get(season) or SEASON_NAMES[int(season) % 4]
+        docs.append({"date": date_str, **rec})
+    return docs
 
 
 def _model_path() -> Path:
+    return _model_path_cached(str(Path.cwd()), os.getenv("MODEL_PATH", ""))
+
+
+@lru_cache(maxsize=8)
+def _model_path_cached(cwd: str, env_model_path: str) -> Path:
+    """Resolve the model file once per (cwd, MODEL_PATH); call cache_clear() if files move."""
     root = Path(__file__).resolve().parent.parent.parent.parent  # TIDAL2026
     for p in [
-        Path.cwd() / "risk_model_general.joblib",
+        Path(cwd) / "risk_model_general.joblib",
         root / "risk_model_general.joblib",
         Path(__file__).resolve().parent / "risk_model_general.joblib",
-        Path(os.getenv("MODEL_PATH", "")),
+        Path(env_model_path),
     ]:
         if p and str(p) and p.exists():
             return p
-    return Path.cwd() / "risk_model_general.joblib"
+    return Path(cwd) / "risk_model_general.joblib"
 
 
+@lru_cache(maxsize=128)
 def _lat_lon_from_location_id(location_id: str) -> tuple[float, float]:
     """Parse location_id like '37.77_-122.42' or 'zip_94102' (return default for zip)."""
     if "_" in location_id and not location_id.startswith("zip_"):
@@ -117,61 +141,58 @@ def _synthetic_raw(
 ) -> pd.DataFrame:
     """Build minimal raw DataFrame for prediction when MongoDB is unavailable. Uses trained model."""
     lat, lon = _lat_lon_from_location_id(location_id)
-    end_d = pd.Timestamp(end_date_str).normalize().date()
-    rows = []
-    for i in range(num_days - 1, -1, -1):
-        d = end_d - timedelta(days=i)
-        dow = d.weekday()
-        month = d.month
-        season = (month % 12 + 3) // 3  # 1=winter,2=spring,3=summer,4=fall
-        j = (d.toordinal() % 7) / 7.0
-        aqi = 40 + int(30 * j)
-        pm25_mean = 10.0 + 8 * j
-        pm25_max = pm25_mean * 1.4
-        rows.append({
-            "date": pd.Timestamp(d),
-            "location_id": location_id,
-            "AQI": aqi,
-            "PM2_5_max": pm25_max,
-            "PM2_5_mean": pm25_mean,
-            "temp_max": 22.0 + 5 * j,
-            "temp_min": 10.0 + 3 * j,
-            "humidity": 55.0 + 20 * j,
-            "wind": 5.0 + 5 * j,
-            "pollen_tree": 2.0 + 2 * j,
-            "pollen_grass": 1.0 + j,
-            "pollen_weed": 0.5 + j,
-            "day_of_week": dow,
-            "month": month,
-            "season": season,
-            "holiday_flag": 0,
-            "latitude": lat,
-            "longitude": lon,
-            "zip_code": location_id.replace("zip_", "", 1) if location_id.startswith("zip_") else "94102",
-            "rain": 0.0,
-            "pressure": 1013.0,
-        })
-    return pd.DataFrame(rows)
-
-
-def _build_prediction_X(row: pd.Series, feature_cols: list[str], pipe: object) -> pd.DataFrame | None:
-    """Build a one-row DataFrame for the pipeline, using pipeline expected columns if available."""
+    dates = pd.date_range(end=pd.Timestamp(end_date_str).normalize(), periods=num_days)
+    month = dates.month.to_numpy(dtype=np.int64)
+    # date.toordinal() == days since the Unix epoch + ordinal of 1970-01-01
+    ordinal = dates.to_numpy().astype("datetime64[D]").astype(np.int64) + 719163
+    j = (ordinal % 7) / 7.0
+    pm25_mean = 10.0 + 8 * j
+    return pd.DataFrame({
+        "date": dates,
+        "location_id": location_id,
+        "AQI": 40 + (30 * j).astype(np.int64),
+        "PM2_5_max": pm25_mean * 1.4,
+        "PM2_5_mean": pm25_mean,
+        "temp_max": 22.0 + 5 * j,
+        "temp_min": 10.0 + 3 * j,
+        "humidity": 55.0 + 20 * j,
+        "wind": 5.0 + 5 * j,
+        "pollen_tree": 2.0 + 2 * j,
+        "pollen_grass": 1.0 + j,
+        "pollen_weed": 0.5 + j,
+        "day_of_week": dates.weekday.to_numpy(dtype=np.int64),
+        "month": month,
+        "season": (month % 12 + 3) // 3,  # 1=winter,2=spring,3=summer,4=fall
+        "holiday_flag": 0,
+        "latitude": lat,
+        "longitude": lon,
+        "zip_code": location_id.replace("zip_", "", 1) if location_id.startswith("zip_") else "94102",
+        "rain": 0.0,
+        "pressure": 1013.0,
+    })
+
+
+def _build_prediction_X(rows: pd.DataFrame, feature_cols: list[str], pipe: object) -> pd.DataFrame | np.ndarray | None:
+    """Build the N-row model input, using the model's expected columns if available.
+
+    Models fitted on a DataFrame (a Pipeline's preprocess step, or a bare estimator such as
+    trainingModel's HGB) select columns by name, so they get a DataFrame; otherwise the
+    columns are handed over as a plain (N, F) array.
+    """
     preprocess = getattr(pipe, "named_steps", {}).get("preprocess") if hasattr(pipe, "named_steps") else None
     if preprocess is not None and hasattr(preprocess, "feature_names_in_"):
         required = list(preprocess.feature_names_in_)
+    elif hasattr(pipe, "feature_names_in_"):
+        required = list(pipe.feature_names_in_)
     else:
         required = feature_cols
-    missing = [c for c in required if c not in row.index]
-    if missing:
-        row = row.copy()
-        for c in missing:
-            row[c] = 0
     try:
-        return row[required].to_frame().T
-    except (KeyError, TypeError) as e:
+        X = rows.reindex(columns=required, fill_value=0)
+    except (KeyError, TypeError, ValueError) as e:
         if os.getenv("PREDICT_DEBUG"):
             print(f"predict_risk: _build_prediction_X failed: {e!s}", file=sys.stderr)
         return None
+    return X if hasattr(pipe, "feature_names_in_") else X.to_numpy()
 
 
 def _proba_to_score_and_level(proba: float) -> tuple[float, str, str]:
@@ -183,120 +204,275 @@ def _proba_to_score_and_level(proba: float) -> tuple[float, str, str]:
     return (4 + (proba - 0.5) * 2, "high", "High")
 
 
-def _data_driven_proba(row_or_raw) -> float:
-    """Pseudo-proba from env data when model is not used, so score varies (not always 3)."""
-    if row_or_raw is None:
-        return 0.3
-    r = row_or_raw
-    aqi = float(r.get("AQI") or 0)
-    pm25 = float(r.get("PM2_5_mean") or 0)
-    pollen = r.get("pollen_total")
-    if pollen is None or (isinstance(pollen, float) and pd.isna(pollen)):
-        pollen = float(r.get("pollen_tree") or 0) + float(r.get("pollen_grass") or 0) + float(r.get("pollen_weed") or 0)
-    else:
-        pollen = float(pollen)
-    proba = 0.15 + min(0.2, aqi / 400) + min(0.15, pm25 / 200) + min(0.1, pollen / 80)
-    return float(max(0.05, min(0.95, proba)))
-
-
-def _active_risk_factors(row: pd.Series) -> list[dict]:
-    """Build API risk factors from a single row (env + pollen)."""
+def _numeric_col(df: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), default)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def _data_driven_proba_batch(df: pd.DataFrame) -> np.ndarray:
+    """Pseudo-proba per row from env data when model is not used, so score varies (not always 3).
+
+    np.fmin ignores NaN just like builtin min(cap, nan) returns cap, so a NaN input still
+    contributes its full cap.
+    """
+    pollen = _numeric_col(df, "pollen_total", np.nan)
+    pollen = np.where(
+        np.isnan(pollen),
+        _numeric_col(df, "pollen_tree") + _numeric_col(df, "pollen_grass") + _numeric_col(df, "pollen_weed"),
+        pollen,
+    )
+    proba = (
+        0.15
+        + np.fmin(0.2, _numeric_col(df, "AQI") / 400)
+        + np.fmin(0.15, _numeric_col(df, "PM2_5_mean") / 200)
+        + np.fmin(0.1, pollen / 80)
+    )
+    return np.fmax(0.05, np.fmin(0.95, proba))
+
+
+# (column, comparison, threshold, factor) in API order; "general" is used when none apply
+RISK_FACTOR_RULES = (
+    ("AQI", "ge", AQI_HIGH, {"id": "air", "label": "Poor Air Quality", "iconKey": "wind"}),
+    ("PM2_5_mean", "ge", PM25_HIGH, {"id": "pm25", "label": "High PM2.5", "iconKey": "wind"}),
+    ("pollen_total", "ge", POLLEN_HIGH, {"id": "pollen", "label": "High Pollen", "iconKey": "sprout"}),
+    ("temp_min", "lt", 5, {"id": "temp", "label": "Cold Temperature", "iconKey": "thermometer"}),
+    ("humidity", "ge", 80, {"id": "humidity", "label": "High Humidity", "iconKey": "droplets"}),
+)
+GENERAL_FACTOR = {"id": "general", "label": "Environmental conditions", "iconKey": "wind"}
+
+
+def _active_risk_factors_batch(df: pd.DataFrame) -> list[list[dict]]:
+    """
+    Build API risk factors for every row of df (env + pollen) from one threshold mask per rule.
+    Each factor is a fresh dict, so callers can edit results without touching the rule table.
+    """
+    masks = np.zeros((len(df), len(RISK_FACTOR_RULES)), dtype=bool)
+    for j, (col, op, thresh, _) in enumerate(RISK_FACTOR_RULES):
+        if col in df.columns:
+            vals = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            masks[:, j] = vals >= thresh if op == "ge" else vals < thresh
     factors = []
-    aqi = row.get("AQI")
-    if aqi is not None and float(aqi) >= AQI_HIGH:
-        factors.append({"id": "air", "label": "Poor Air Quality", "iconKey": "wind"})
-    pm25 = row.get("PM2_5_mean")
-    if pm25 is not None and float(pm25) >= PM25_HIGH:
-        factors.append({"id": "pm25", "label": "High PM2.5", "iconKey": "wind"})
-    pollen_total = row.get("pollen_total")
-    if pollen_total is not None and float(pollen_total) >= POLLEN_HIGH:
-        factors.append({"id": "pollen", "label": "High Pollen", "iconKey": "sprout"})
-    temp_min = row.get("temp_min")
-    if temp_min is not None and float(temp_min) < 5:
-        factors.append({"id": "temp", "label": "Cold Temperature", "iconKey": "thermometer"})
-    humidity = row.get("humidity")
-    if humidity is not None and float(humidity) >= 80:
-        factors.append({"id": "humidity", "label": "High Humidity", "iconKey": "droplets"})
-    if not factors:
-        factors.append({"id": "general", "label": "Environmental conditions", "iconKey": "wind"})
+    for row_mask in masks:
+        hits = np.flatnonzero(row_mask)
+        factors.append([dict(RISK_FACTOR_RULES[j][3]) for j in hits] if len(hits) else [dict(GENERAL_FACTOR)])
     return factors
 
 
-def _predict_one(
-    date_str: str,
+def _format_result(date_str: str, proba: float, factors: list[dict], daily: dict) -> dict:
+    score, level, label = _proba_to_score_and_level(proba)
+    return {
+        "date": date_str,
+        "risk": {"score": round(score, 1), "level": level, "label": label},
+        "activeRiskFactors": factors,
+        "daily": daily,
+    }
+
+
+def _first_positions(df: pd.DataFrame, targets: list[pd.Timestamp], default: int) -> np.ndarray:
+    """Position of the first row whose _date_norm matches each target, else default."""
+    dates = pd.Index(df["_date_norm"])
+    first = ~dates.duplicated()
+    hits = dates[first].get_indexer(targets)
+    return np.where(hits >= 0, np.flatnonzero(first)[hits], default)
+
+
+def _predict_dates(
+    date_strs: list[str],
     raw: pd.DataFrame,
     fe: pd.DataFrame,
     pipe: object | None,
-) -> dict:
-    """Predict risk for one date; raw and fe must already have _date_norm. Returns one result dict."""
-    target_date = pd.Timestamp(date_str).normalize()
-    raw_match = raw[raw["_date_norm"] == target_date]
-    raw_row = raw_match.iloc[0] if not raw_match.empty else (raw.iloc[-1] if not raw.empty else None)
+) -> list[dict]:
+    """Predict risk for several dates with one predict_proba call; raw and fe must already have _date_norm."""
+    targets = [pd.Timestamp(d).normalize() for d in date_strs]
+    if raw.empty:
+        dailies = [{}] * len(targets)
+    else:
+        raw_sel = raw.iloc[_first_positions(raw, targets, len(raw) - 1)]
+        dailies = _daily_docs_from_frame(raw_sel, date_strs)
 
     if fe.empty:
-        daily = _daily_doc_from_row(raw_row, date_str) if raw_row is not None else {}
-        proba = _data_driven_proba(raw_row)
-        score, level, label = _proba_to_score_and_level(proba)
-        return {
-            "date": date_str,
-            "risk": {"score": round(score, 1), "level": level, "label": label},
-            "activeRiskFactors": _active_risk_factors(raw_row) if raw_row is not None else [],
-            "daily": daily,
-        }
-
-    match = fe[fe["_date_norm"] == target_date]
-    if match.empty:
-        match = fe.tail(1)
-    row = match.iloc[0]
-    daily_row = raw_row if raw_row is not None else row
-    daily = _daily_doc_from_row(daily_row, date_str)
+        if raw.empty:
+            probas, factors = [0.3] * len(targets), [[]] * len(targets)
+        else:
+            if "pollen_total" not in raw_sel.columns:
+                # Same total feature_engineer derives, so the pollen factor still applies
+                pollen = raw_sel.reindex(columns=["pollen_tree", "pollen_grass", "pollen_weed"])
+                raw_sel = raw_sel.assign(pollen_total=pollen.fillna(0).sum(axis=1))
+            probas, factors = _data_driven_proba_batch(raw_sel), _active_risk_factors_batch(raw_sel)
+        return [
+            _format_result(date_str, float(proba), f, daily)
+            for date_str, proba, f, daily in zip(date_strs, probas, factors, dailies)
+        ]
+
+    rows = fe.iloc[_first_positions(fe, targets, len(fe) - 1)]
+    if raw.empty:
+        dailies = _daily_docs_from_frame(rows, date_strs)
 
     # Use same feature set as training: exclude lat/lon/zip/date (training also excludes y, tomorrow cols)
     drop_cols = {"latitude", "longitude", "zip_code", "date", "_date_norm"}
     feature_cols = [c for c in fe.columns if c not in drop_cols]
 
+    probas = None
     if pipe is None:
         if os.getenv("PREDICT_DEBUG"):
             print("predict_risk: model not loaded (pipe is None)", file=sys.stderr)
-        proba = _data_driven_proba(row)
-        score, level, label = _proba_to_score_and_level(proba)
-        return {
-            "date": date_str,
-            "risk": {"score": round(score, 1), "level": level, "label": label},
-            "activeRiskFactors": _active_risk_factors(row),
-            "daily": daily,
-        }
-
-    X = _build_prediction_X(row, feature_cols, pipe)
-    if X is None:
-        proba = _data_driven_proba(row)
-        score, level, label = _proba_to_score_and_level(proba)
-        return {
-            "date": date_str,
-            "risk": {"score": round(score, 1), "level": level, "label": label},
-            "activeRiskFactors": _active_risk_factors(row),
-            "daily": daily,
-        }
+    else:
+        X = _build_prediction_X(rows, feature_cols, pipe)
+        if X is not None:
+            try:
+                probas = pipe.predict_proba(X)[:, 1]
+            except Exception as e:
+                if os.getenv("PREDICT_DEBUG"):
+                    print(f"predict_risk: predict_proba failed: {e!s}", file=sys.stderr)
+    if probas is None:
+        probas = _data_driven_proba_batch(rows)
+    factors = _active_risk_factors_batch(rows)
+    return [
+        _format_result(date_str, float(proba), f, daily)
+        for date_str, proba, f, daily in zip(date_strs, probas, factors, dailies)
+    ]
+
+
+def _predict_one(
+    date_str: str,
+    raw: pd.DataFrame,
+    fe: pd.DataFrame,
+    pipe: object | None,
+) -> dict:
+    """Predict risk for one date; raw and fe must already have _date_norm. Returns one result dict."""
+    return _predict_dates([date_str], raw, fe, pipe)[0]
+
+
+@lru_cache(maxsize=4)
+def _load_pipe(path_str: str, mtime: float) -> object:
+    """Unpickle the pipeline once per (path, mtime); a retrained model invalidates the entry."""
+    pipe = joblib.load(path_str)
+    # A week is at most 14 rows: spinning up a joblib worker pool costs more than the
+    # prediction itself, so run every step (including nested ones) single-threaded.
+    if hasattr(pipe, "get_params"):
+        pipe.set_params(**{k: 1 for k in pipe.get_params() if k == "n_jobs" or k.endswith("__n_jobs")})
+    return pipe
+
+
+def _get_pipe() -> object | None:
+    model_path = _model_path()
+    if not model_path.exists():
+        return None
     try:
-        proba = float(pipe.predict_proba(X)[0, 1])
-    except Exception as e:
-        if os.getenv("PREDICT_DEBUG"):
-            print(f"predict_risk: predict_proba failed: {e!s}", file=sys.stderr)
-        proba = _data_driven_proba(row)
-        score, level, label = _proba_to_score_and_level(proba)
-        return {
-            "date": date_str,
-            "risk": {"score": round(score, 1), "level": level, "label": label},
-            "activeRiskFactors": _active_risk_factors(row),
-            "daily": daily,
-        }
-    score, level, label = _proba_to_score_and_level(proba)
-    return {
-        "date": date_str,
-        "risk": {"score": round(score, 1), "level": level, "label": label},
-        "activeRiskFactors": _active_risk_factors(row),
-        "daily": daily,
-    }
+        return _load_pipe(str(model_path), model_path.stat().st_mtime)
+    except Exception:
+        return None
+
+
+_FE_CACHE: dict = {}
+# Raw rows per location fed to feature_engineer before the first requested date. Lags and
+# rolling windows are row-based and need 6 earlier rows; the rest is slack. Counted in rows,
+# not days, so sparse locations keep their history.
+FE_LOOKBACK_ROWS = 30
+
+
+def _ensure_date_norm(df: pd.DataFrame, col: str = "date") -> None:
+    """Parse df[col] if needed and add _date_norm (midnight of each date) in place."""
+    if not pd.api.types.is_datetime64_any_dtype(df[col]):
+        df[col] = pd.to_datetime(df[col], cache=True)
+    if getattr(df[col].dt, "tz", None) is not None:
+        df["_date_norm"] = df[col].dt.normalize()
+    else:
+        df["_date_norm"] = df[col].to_numpy().astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def _history_from(raw: pd.DataFrame, lo: pd.Timestamp) -> pd.DataFrame:
+    """Rows dated lo or later plus, per location, the FE_LOOKBACK_ROWS rows just before them.
+    raw must be date-sorted within each location (as read_env_from_mongo returns it)."""
+    loc = raw["location_id"] if "location_id" in raw.columns else pd.Series(0, index=raw.index)
+    pos = raw.groupby(loc, sort=False, dropna=False).cumcount().to_numpy()
+    n_before = (raw["_date_norm"] < lo).groupby(loc, sort=False, dropna=False).transform("sum").to_numpy()
+    return raw[pos >= n_before - FE_LOOKBACK_ROWS]
+
+
+def _prepare_frames(
+    raw: pd.DataFrame, location_id: str | None, start: pd.Timestamp, engineer: bool = True
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Normalize raw dates and engineer features from `start` (minus FE_LOOKBACK_ROWS rows) onward.
+
+    Reuses the last fe while raw (including its values) and the window are unchanged.
+    There is no upper bound so fe.tail(1), the fallback for dates without data, is still
+    the latest row.
+    With engineer=False (no model to feed) fe is empty and predictions use raw rows.
+    """
+    from apps.ml.trainingModel import feature_engineer
+
+    _ensure_date_norm(raw)
+    if not engineer:
+        return raw, pd.DataFrame()
+    latest = raw["_date_norm"].max()
+    lo = start if pd.isna(latest) else min(start, latest)
+    # Content hash too: a re-ingested day changes values without changing row count or dates
+    content = int(pd.util.hash_pandas_object(raw, index=False).sum())
+    key = (location_id, len(raw), raw["_date_norm"].min(), latest, lo, content)
+    fe = _FE_CACHE.get(key)
+    if fe is None:
+        fe = feature_engineer(_history_from(raw, lo))
+        if not fe.empty:
+            _ensure_date_norm(fe)
+        _FE_CACHE.clear()
+        _FE_CACHE[key] = fe
+    return raw, fe
+
+
+def _week_payload(start_str: str, days: int, location_id: str | None = None) -> dict:
+    from apps.ml.trainingModel import read_env_from_mongo
+
+    start_d = pd.Timestamp(start_str).date()
+    days = max(1, min(days, 14))
+    try:
+        raw = read_env_from_mongo()
+    except Exception:
+        end_d = start_d + timedelta(days=days - 1)
+        raw = _synthetic_raw(
+            end_d.strftime("%Y-%m-%d"),
+            num_days=14 + days,
+            location_id=location_id or "default",
+        )
+    pipe = _get_pipe()
+    raw, fe = _prepare_frames(raw, location_id, pd.Timestamp(start_d), engineer=pipe is not None)
+    date_strs = [(start_d + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    return {"start": start_str, "days": _predict_dates(date_strs, raw, fe, pipe)}
+
+
+def _date_payload(date_str: str, location_id: str | None = None) -> dict:
+    try:
+        return _run_date_prediction(date_str, location_id)
+    except Exception:
+        raw = _synthetic_raw(date_str, location_id=location_id or "default")
+        pipe = _get_pipe()
+        raw, fe = _prepare_frames(raw, location_id, pd.Timestamp(date_str).normalize(), engineer=pipe is not None)
+        return _predict_one(date_str, raw, fe, pipe)
+
+
+def _serve(location_id: str | None) -> None:
+    """Answer newline-delimited JSON requests from stdin, keeping the model and frames warm.
+
+    Each line is {"date": "YYYY-MM-DD"} or {"week": true, "start": "YYYY-MM-DD", "days": 7},
+    optionally with "location_id"; one JSON response line is written per request.
+    """
+    from apps.ml import trainingModel
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+            lid = req.get("location_id") or location_id
+            trainingModel.LOCATION_ID = lid or os.getenv("LOCATION_ID")
+            if req.get("week"):
+                out = _week_payload(str(req["start"]).strip(), int(req.get("days", 7)), lid)
+            else:
+                out = _date_payload(str(req["date"]).strip(), lid)
+        except Exception as e:
+            out = {"error": str(e)}
+        print(_dumps(out), flush=True)
 
 
 def main() -> None:
@@ -306,101 +482,50 @@ def main() -> None:
     parser.add_argument("--start", help="Start date YYYY-MM-DD (required if --week)")
     parser.add_argument("--days", type=int, default=7, help="Number of days when --week (default 7)")
     parser.add_argument("--location-id", default=None, help="Optional location_id filter")
+    parser.add_argument("--serve", action="store_true", help="Read JSON requests from stdin, one per line")
     args = parser.parse_args()
 
     if args.location_id:
         os.environ["LOCATION_ID"] = args.location_id
 
-    from apps.ml.trainingModel import read_env_from_mongo, feature_engineer
+    if args.serve:
+        _serve(args.location_id)
+        return
 
     if args.week:
         if not args.start or len(args.start.strip()) != 10:
-            print(json.dumps({"error": "With --week provide --start YYYY-MM-DD"}), file=sys.stderr)
+            print(_dumps({"error": "With --week provide --start YYYY-MM-DD"}), file=sys.stderr)
             sys.exit(1)
         try:
-            start_d = pd.Timestamp(args.start.strip()).date()
+            pd.Timestamp(args.start.strip()).date()
         except (ValueError, TypeError):
-            print(json.dumps({"error": "Invalid --start; use YYYY-MM-DD"}), file=sys.stderr)
+            print(_dumps({"error": "Invalid --start; use YYYY-MM-DD"}), file=sys.stderr)
             sys.exit(1)
-        days = max(1, min(args.days, 14))
-        try:
-            raw = read_env_from_mongo()
-        except Exception:
-            start_d = pd.Timestamp(args.start.strip()).date()
-            end_d = start_d + timedelta(days=days - 1)
-            raw = _synthetic_raw(
-                end_d.strftime("%Y-%m-%d"),
-                num_days=14 + days,
-                location_id=args.location_id or "default",
-            )
-        raw["date"] = pd.to_datetime(raw["date"])
-        raw["_date_norm"] = raw["date"].dt.normalize()
-        fe = feature_engineer(raw)
-        fe["_date_norm"] = pd.to_datetime(fe["date"]).dt.normalize()
-        pipe = None
-        model_path = _model_path()
-        if model_path.exists():
-            try:
-                pipe = joblib.load(model_path)
-            except Exception:
-                pass
-        results = []
-        for i in range(days):
-            d = start_d + timedelta(days=i)
-            date_str = d.strftime("%Y-%m-%d")
-            results.append(_predict_one(date_str, raw, fe, pipe))
-        print(json.dumps({"start": args.start.strip(), "days": results}), flush=True)
+        print(_dumps(_week_payload(args.start.strip(), args.days, args.location_id)), flush=True)
         return
 
     if not args.date or len(args.date.strip()) != 10 or args.date[4] != "-" or args.date[7] != "-":
-        print(json.dumps({"error": "Provide --date YYYY-MM-DD or --week --start YYYY-MM-DD"}), file=sys.stderr)
+        print(_dumps({"error": "Provide --date YYYY-MM-DD or --week --start YYYY-MM-DD"}), file=sys.stderr)
         sys.exit(1)
-    date_str = args.date.strip()
-
     try:
-        _run_date_prediction(date_str, args.location_id)
-    except Exception:
-        try:
-            raw = _synthetic_raw(date_str, location_id=args.location_id or "default")
-            raw["date"] = pd.to_datetime(raw["date"])
-            raw["_date_norm"] = raw["date"].dt.normalize()
-            fe = feature_engineer(raw)
-            if not fe.empty:
-                fe["_date_norm"] = pd.to_datetime(fe["date"]).dt.normalize()
-            pipe = None
-            model_path = _model_path()
-            if model_path.exists():
-                try:
-                    pipe = joblib.load(model_path)
-                except Exception:
-                    pass
-            out = _predict_one(date_str, raw, fe, pipe)
-            print(json.dumps(out), flush=True)
-        except Exception as e:
-            print(json.dumps({"error": str(e)}), file=sys.stderr)
-            sys.exit(1)
+        out = _date_payload(args.date.strip(), args.location_id)
+    except Exception as e:
+        print(_dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+    print(_dumps(out), flush=True)
 
 
-def _run_date_prediction(date_str: str, location_id: str | None = None) -> None:
+def _run_date_prediction(date_str: str, location_id: str | None = None) -> dict:
     """Load data, engineer features, load model, predict for one date. Raises on failure."""
+    from apps.ml.trainingModel import read_env_from_mongo
+
     try:
         raw = read_env_from_mongo()
     except Exception:
         raw = _synthetic_raw(date_str, location_id=location_id or "default")
-    raw["date"] = pd.to_datetime(raw["date"])
-    raw["_date_norm"] = raw["date"].dt.normalize()
-    fe = feature_engineer(raw)
-    if not fe.empty:
-        fe["_date_norm"] = pd.to_datetime(fe["date"]).dt.normalize()
-    pipe = None
-    model_path = _model_path()
-    if model_path.exists():
-        try:
-            pipe = joblib.load(model_path)
-        except Exception:
-            pass
-    out = _predict_one(date_str, raw, fe, pipe)
-    print(json.dumps(out), flush=True)
+    pipe = _get_pipe()
+    raw, fe = _prepare_frames(raw, location_id, pd.Timestamp(date_str).normalize(), engineer=pipe is not None)
+    return _predict_one(date_str, raw, fe, pipe)
 
 
 if __name__ == "__main__":
@@ -51,6 +51,7 @@ def _mongo_uri():
 DB_NAME = os.environ.get("MONGODB_DB") or os.environ.get("DB_NAME", "tidal")
 ENV_COLL = os.environ.get("ML_ENV_COLL") or os.environ.get("ENV_COLL") or os.environ.get("MONGODB_COLLECTION", "pulldata")
 LABEL_COLL = os.environ.get("LABEL_COLL", "symptom_daily")
+INSERT_BATCH = 10_000
 
 
 def main():
@@ -70,24 +71,26 @@ def main():
         print(f"No docs in {DB_NAME}.{ENV_COLL}. Run TIDAL pull first.", file=sys.stderr)
         sys.exit(1)
 
-    import random
-    random.seed(args.seed)
-    to_insert = []
-    for d in docs:
-        date_str = d.get("date")
-        if not date_str:
-            continue
-        aqi = d.get("AQI")
-        pm = d.get("PM2_5_mean")
-        if args.rule_based:
-            flare = 1 if (aqi is not None and aqi > 50) or (pm is not None and pm > 15) else 0
-        else:
-            flare = random.randint(0, 1)
-        to_insert.append({"user_id": args.user, "date": date_str, "flare": flare})
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(docs).reindex(columns=["AQI", "PM2_5_mean"])
+    if args.rule_based:
+        aqi = np.nan_to_num(pd.to_numeric(df["AQI"], errors="coerce").to_numpy(dtype=float))
+        pm = np.nan_to_num(pd.to_numeric(df["PM2_5_mean"], errors="coerce").to_numpy(dtype=float))
+        flares = ((aqi > 50) | (pm > 15)).astype(int)
+    else:
+        flares = np.random.default_rng(args.seed).integers(0, 2, len(docs))
+    to_insert = [
+        {"user_id": args.user, "date": date_str, "flare": int(flare)}
+        for date_str, flare in zip((d.get("date") for d in docs), flares)
+        if date_str
+    ]
 
     if to_insert:
         label_coll.delete_many({"user_id": args.user})
-        label_coll.insert_many(to_insert)
+        for i in range(0, len(to_insert), INSERT_BATCH):
+            label_coll.insert_many(to_insert[i:i + INSERT_BATCH], ordered=False)
         print(f"Inserted {len(to_insert)} labels for user_id={args.user!r} into {DB_NAME}.{LABEL_COLL}")
     else:
         print("No dates to label.", file=sys.stderr)
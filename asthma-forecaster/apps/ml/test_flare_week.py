@@ -39,16 +39,24 @@ def _bootstrap():
 
 _bootstrap()
 
+import numpy as np
 import pandas as pd
 import joblib
 
 # Reuse predict_flare helpers
 from apps.ml.predict_flare import (
     _flare_model_path,
-    _predict_one_date,
+    _predict_dates,
+    _prepare_bundle,
 )
 
 
+SEASON_BY_MONTH = np.array([
+    "winter", "winter", "spring", "spring", "spring", "summer",
+    "summer", "summer", "fall", "fall", "fall", "winter",
+])
+
+
 def build_week_data() -> pd.DataFrame:
     """
     Build 7 days of test data in the user/flare schema.
@@ -74,25 +82,11 @@ def build_week_data() -> pd.DataFrame:
         "pollen_weed": None,
         "holiday_flag": False,
     }
-    start = date(2026, 2, 7)
-    rows = []
-    for i in range(7):
-        d = start + timedelta(days=i)
-        row = dict(base)
-        row["date"] = d.isoformat()
-        row["day_of_week"] = d.strftime("%A")
-        row["month"] = d.month
-        if d.month in (12, 1, 2):
-            row["season"] = "winter"
-        elif d.month in (3, 4, 5):
-            row["season"] = "spring"
-        elif d.month in (6, 7, 8):
-            row["season"] = "summer"
-        else:
-            row["season"] = "fall"
-        rows.append(row)
-    df = pd.DataFrame(rows)
-    df["date"] = pd.to_datetime(df["date"])
+    dates = pd.date_range("2026-02-07", periods=7)
+    df = pd.DataFrame({**{k: [v] * len(dates) for k, v in base.items()}, "date": dates})
+    df["day_of_week"] = dates.strftime("%A")
+    df["month"] = dates.month.astype("int64")
+    df["season"] = SEASON_BY_MONTH[dates.month - 1]
     df["location_id"] = df["locationid"].str.replace("-", "_", n=1)
     # Fill NaN numeric cols for model
     for col in ["pollen_tree", "pollen_grass", "pollen_weed"]:
@@ -110,16 +104,13 @@ def main() -> int:
     if not bundle.get("model") or not bundle.get("feature_order"):
         print("Invalid flare model bundle", file=sys.stderr)
         return 1
+    _prepare_bundle(bundle)
 
     raw = build_week_data()
     start_str = "2026-02-07"
     days = 7
-    results = []
-    for i in range(days):
-        d = date(2026, 2, 7) + timedelta(days=i)
-        date_str = d.strftime("%Y-%m-%d")
-        out = _predict_one_date(date_str, raw, bundle, None)
-        results.append(out)
+    dates = [date(2026, 2, 7) + timedelta(days=i) for i in range(days)]
+    results = _predict_dates(dates, raw, bundle, None)
 
     print("Flare model test on week data (2026-02-07 .. 2026-02-13)")
     print("-" * 60)
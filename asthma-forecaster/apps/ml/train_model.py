@@ -42,6 +42,7 @@ from sklearn.metrics import (
     roc_curve,
 )
 from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
 # Must match main.FEATURE_ORDER
@@ -52,14 +53,10 @@ FEATURE_ORDER = [
 
 SEVERE_THRESHOLD = 4.0  # symptomScore >= 4 = severe
 
-
-def _safe_float(x) -> float | None:
-    if x is None:
-        return None
-    try:
-        return float(x)
-    except (TypeError, ValueError):
-        return None
+# Only the fields load_training_data reads
+CHECKIN_PROJECTION = {"_id": 0, "date": 1, "symptomScore": 1}
+ENV_PROJECTION = {"_id": 0, "date": 1, "locationKey": 1, "air_quality": 1, "weather": 1, "pollen": 1}
+CURSOR_BATCH = 5000
 
 
 def _flatten_env(doc: dict) -> dict:
@@ -81,51 +78,34 @@ def _flatten_env(doc: dict) -> dict:
     return out
 
 
-def load_training_data(db, location_key: str | None = None) -> tuple[list[list[float]], list[int]]:
+def load_training_data(db, location_key: str | None = None) -> tuple[np.ndarray, np.ndarray]:
     """Load checkins + environment_daily, build features and severe (0/1) target."""
-    checkins = list(db.checkins.find({}))
-    env_docs = list(db.environment_daily.find({}))
-    if location_key:
-        env_docs = [e for e in env_docs if e.get("locationKey") == location_key]
-
-    env_by_date = {}
-    for e in env_docs:
-        d = e.get("date")
-        if d:
-            env_by_date[d] = _flatten_env(e)
-
-    X_rows = []
-    y_list = []
-    for c in checkins:
-        date_val = c.get("date")
-        if not date_val:
-            continue
-        env = env_by_date.get(date_val)
-        if not env:
-            continue
-        symptom = _safe_float(c.get("symptomScore")) or 0.0
-        tree = _safe_float(env.get("tree_index"))
-        grass = _safe_float(env.get("grass_index"))
-        weed = _safe_float(env.get("weed_index"))
-        weighted_pollen = (tree or 0) + (grass or 0) + (weed or 0)
-        row = {
-            "aqi": _safe_float(env.get("aqi")),
-            "pm25": _safe_float(env.get("pm25_mean")) or _safe_float(env.get("pm25_max")),
-            "tree_index": tree,
-            "grass_index": grass,
-            "weed_index": weed,
-            "weighted_pollen": weighted_pollen,
-            "humidity": _safe_float(env.get("humidity_mean")) or _safe_float(env.get("humidity_max")),
-            "wind_speed_kmh": _safe_float(env.get("wind_speed_kmh")),
-            "rain_mm": _safe_float(env.get("rain_mm")),
-            "temp_max_c": _safe_float(env.get("temp_max_c")),
-            "symptom_score_today": symptom,
-        }
-        vec = [float(row.get(k) if row.get(k) is not None else 0.0) for k in FEATURE_ORDER]
-        X_rows.append(vec)
-        y_list.append(1 if symptom >= SEVERE_THRESHOLD else 0)
-
-    return X_rows, y_list
+    import pandas as pd
+
+    checkins = db.checkins.find({}, CHECKIN_PROJECTION).batch_size(CURSOR_BATCH)
+    env_docs = db.environment_daily.find(
+        {"locationKey": location_key} if location_key else {}, ENV_PROJECTION
+    ).batch_size(CURSOR_BATCH)
+
+    # One env row per date; the last doc for a date wins
+    env = pd.DataFrame(
+        [_flatten_env(e) for e in env_docs if e.get("date")], columns=list(_flatten_env({}))
+    ).drop_duplicates("date", keep="last")
+    ck = pd.DataFrame(list(checkins), columns=["date", "symptomScore"])
+    merged = ck.merge(env.drop(columns="locationKey"), on="date", how="inner")
+    vals = merged.drop(columns="date").apply(pd.to_numeric, errors="coerce")
+
+    symptom = vals["symptomScore"].fillna(0.0)
+    # A zero mean falls back to the max, like the "mean or max" lookup it replaces
+    features = vals.assign(
+        pm25=vals["pm25_mean"].where(vals["pm25_mean"] != 0).fillna(vals["pm25_max"]),
+        humidity=vals["humidity_mean"].where(vals["humidity_mean"] != 0).fillna(vals["humidity_max"]),
+        weighted_pollen=vals[["tree_index", "grass_index", "weed_index"]].fillna(0).sum(axis=1),
+        symptom_score_today=symptom,
+    )
+    X = features[FEATURE_ORDER].fillna(0.0).to_numpy(dtype=np.float64)
+    y = (symptom.to_numpy() >= SEVERE_THRESHOLD).astype(np.int64)
+    return X, y
 
 
 def save_presentation_charts(
@@ -176,8 +156,9 @@ def save_presentation_charts(
     plt.close()
 
     # 3. Feature coefficients (LogisticRegression)
-    if hasattr(model, "coef_") and model.coef_.size > 0:
-        coef = model.coef_.ravel()
+    clf = model[-1] if isinstance(model, Pipeline) else model
+    if hasattr(clf, "coef_") and clf.coef_.size > 0:
+        coef = clf.coef_.ravel()
         order = np.argsort(np.abs(coef))[-15:]
         fig, ax = plt.subplots(figsize=(8, max(4, len(order) * 0.35)))
         ax.barh([feature_order[i] for i in order], coef[order], color="#3498db", edgecolor="black")
@@ -241,6 +222,24 @@ def save_presentation_charts(
     print(f"Presentation charts saved to {out_dir}")
 
 
+def build_model() -> Pipeline:
+    """Unfitted scaler + classifier Pipeline used for training."""
+    # liblinear's coordinate descent converges quickly on this small, dense 11-feature problem
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", LogisticRegression(solver="liblinear", max_iter=200, random_state=42, class_weight="balanced")),
+    ])
+
+
+def model_bundle(model: Pipeline) -> dict:
+    """
+    Saved bundle for a fitted scaler + classifier Pipeline. The Pipeline scales its own input,
+    so there is deliberately no "scaler" key: loaders transform with a bundle's scaler before
+    calling its model, which would scale twice.
+    """
+    return {"model": model, "model_input": "raw", "feature_order": FEATURE_ORDER}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Train allergy severity model")
     parser.add_argument("--out", type=str, default="allergy_model.joblib", help="Output model path")
@@ -267,25 +266,19 @@ def main() -> int:
 
     client = MongoClient(uri)
     db = client[args.db]
-    X_rows, y_list = load_training_data(db, args.location_key)
+    X, y = load_training_data(db, args.location_key)
 
-    if len(X_rows) < args.min_samples:
-        print(f"Not enough data: {len(X_rows)} rows (need at least {args.min_samples}). Ingest checkins and environment_daily, then retry.")
+    if len(X) < args.min_samples:
+        print(f"Not enough data: {len(X)} rows (need at least {args.min_samples}). Ingest checkins and environment_daily, then retry.")
         return 1
 
-    X = np.array(X_rows, dtype=np.float64)
-    y = np.array(y_list, dtype=np.int64)
     n_severe = int(y.sum())
     print(f"Training on {len(y)} samples ({n_severe} severe)")
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-    scaler = StandardScaler()
-    X_train_s = scaler.fit_transform(X_train)
-    X_test_s = scaler.transform(X_test)
-
-    model = LogisticRegression(max_iter=500, random_state=42, class_weight="balanced")
-    model.fit(X_train_s, y_train)
-    acc = (model.predict(X_test_s) == y_test).mean()
+    model = build_model()
+    model.fit(X_train, y_train)
+    acc = (model.predict(X_test) == y_test).mean()
     print(f"Test accuracy: {acc:.3f}")
 
     if args.charts_only:
@@ -294,8 +287,8 @@ def main() -> int:
             charts_dir,
             model=model,
             feature_order=FEATURE_ORDER,
-            X_train=X_train_s,
-            X_test=X_test_s,
+            X_train=X_train,
+            X_test=X_test,
             y_train=y_train,
             y_test=y_test,
             n_train=len(y_train),
@@ -306,8 +299,8 @@ def main() -> int:
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump({"model": model, "scaler": scaler, "feature_order": FEATURE_ORDER}, out_path)
-    print(f"Saved model + scaler to {out_path}")
+    joblib.dump(model_bundle(model), out_path)
+    print(f"Saved model pipeline to {out_path}")
 
     return 0
 
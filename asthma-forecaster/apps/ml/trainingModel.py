@@ -7,6 +7,7 @@ Uses .env from project root for MONGODB_URI, MONGODB_DB; ML_ENV_COLL or ENV_COLL
 Run from TIDAL2026:
   PYTHONPATH=asthma-forecaster python -m apps.ml.trainingModel
   # Or specify collection: ML_ENV_COLL=ml_daily PYTHONPATH=asthma-forecaster python -m apps.ml.trainingModel
+  # Features and the fitted model are cached in apps/ml/.cache while the data is unchanged; ML_CACHE=0 to rebuild
 
 Implements:
 Step 2 — Feature engineering
@@ -33,15 +34,14 @@ pip install pymongo pandas scikit-learn joblib
 
 import os
 import math
+import hashlib
 from pathlib import Path
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 from pymongo import MongoClient
 
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.impute import SimpleImputer
 from sklearn.metrics import roc_auc_score, brier_score_loss
 from sklearn.ensemble import HistGradientBoostingClassifier
 import joblib
@@ -50,7 +50,14 @@ import joblib
 # ----------------------------
 # Config (aligns with .env and data.py: MONGODB_URI, MONGODB_DB, ML_ENV_COLL)
 # ----------------------------
+DOTENV_FLAG = "_TIDAL_DOTENV_LOADED"
+
+
 def _load_dotenv():
+    # Shared with predict_risk / week_data: .env is loaded once per process tree
+    if os.environ.get(DOTENV_FLAG):
+        return
+    os.environ[DOTENV_FLAG] = "1"
     try:
         from dotenv import load_dotenv
         root = Path(__file__).resolve().parent.parent.parent.parent
@@ -65,20 +72,23 @@ def _load_dotenv():
 _load_dotenv()
 
 
+@lru_cache(maxsize=8)
+def _encode_uri_password(uri: str) -> str:
+    """URL-encode the password of a mongodb:// URI (parsed once per distinct URI)."""
+    pre, sep, rest = uri.partition("://")
+    auth, at, host = rest.partition("@")
+    if not sep or not at:
+        return uri
+    user, colon, password = auth.partition(":")
+    if colon:
+        from urllib.parse import quote_plus
+        auth = f"{user}:{quote_plus(password)}"
+    return f"{pre}://{auth}@{host}"
+
+
 def _mongo_uri() -> str:
     uri = os.getenv("MONGODB_URI") or os.getenv("MONGO_URI", "mongodb://localhost:27017")
-    if "@" in uri and "://" in uri:
-        try:
-            from urllib.parse import quote_plus
-            pre, rest = uri.split("://", 1)
-            auth, host = rest.split("@", 1)
-            if ":" in auth:
-                user, password = auth.split(":", 1)
-                auth = f"{user}:{quote_plus(password)}"
-            uri = f"{pre}://{auth}@{host}"
-        except Exception:
-            pass
-    return uri
+    return _encode_uri_password(uri)
 
 
 MONGO_URI = _mongo_uri()
@@ -92,6 +102,48 @@ AQI_HIGH = float(os.getenv("AQI_HIGH", "101"))           # "Unhealthy for Sensit
 PM25_HIGH = float(os.getenv("PM25_HIGH", "35"))          # ~24h mean threshold (μg/m³)
 POLLEN_HIGH = float(os.getenv("POLLEN_HIGH", "8"))       # pollen_total (0–15 scale); use 8 for more positives
 
+# Labeled frame + fitted model cache, keyed by _data_signature() (ML_CACHE=0 disables)
+USE_CACHE = os.getenv("ML_CACHE", "1") != "0"
+CACHE_DIR = Path(os.getenv("ML_CACHE_DIR") or Path(__file__).resolve().parent / ".cache")
+
+
+# Daily-row fields (apps.db.daily_dataset.pull_result_to_daily_row); only these are fetched
+ENV_FIELDS = (
+    "location_id", "latitude", "longitude", "zip_code", "date",
+    "PM2_5_mean", "PM2_5_max", "AQI",
+    "temp_min", "temp_max", "humidity", "wind", "pressure", "rain",
+    "pollen_tree", "pollen_grass", "pollen_weed",
+    "day_of_week", "month", "season", "holiday_flag",
+)
+ENV_BATCH = 5000
+
+
+def _find_columns(coll, query: dict, projection: dict) -> pd.DataFrame:
+    """
+    Stream query results straight into per-field column lists (no list of dicts).
+    Uses pymongoarrow's find_pandas_all when installed.
+    """
+    try:
+        from pymongoarrow.api import find_pandas_all
+        return find_pandas_all(coll, query, projection=projection)
+    except ImportError:
+        pass
+
+    cols: dict[str, list] = {}
+    n = 0
+    for doc in coll.find(query, projection, batch_size=ENV_BATCH):
+        for key, val in doc.items():
+            col = cols.get(key)
+            if col is None:
+                col = cols[key] = [np.nan] * n
+            col.append(val)
+        n += 1
+        if len(doc) < len(cols):
+            for col in cols.values():
+                if len(col) < n:
+                    col.append(np.nan)
+    return pd.DataFrame(cols)
+
 
 def read_env_from_mongo() -> pd.DataFrame:
     client = MongoClient(MONGO_URI)
@@ -101,41 +153,92 @@ def read_env_from_mongo() -> pd.DataFrame:
     if LOCATION_ID:
         query["location_id"] = LOCATION_ID
 
-    docs = list(db[COLL_NAME].find(query, {"_id": 0}))
-    if not docs:
+    projection = {c: 1 for c in ENV_FIELDS}
+    projection["_id"] = 0
+    df = _find_columns(db[COLL_NAME], query, projection)
+    if df.empty:
         raise RuntimeError(f"No documents found in {DB_NAME}.{COLL_NAME} for query={query}")
 
-    df = pd.DataFrame(docs)
-
-    # Ensure date is datetime
-    df["date"] = pd.to_datetime(df["date"])
+    # Ensure date is datetime (BSON dates already arrive as datetime64; strings are ISO, no format inference)
+    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601")
 
     # Sort (critical for time features)
     df = df.sort_values(["location_id", "date"]).reset_index(drop=True)
     return df
 
 
+# Low-cardinality string/code columns kept as pandas categoricals
+CATEGORY_COLS = ("day_of_week", "season", "location_id")
+
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """CATEGORY_COLS -> category (numeric columns are left as read).
+
+    Training only; numerics stay float64 so the model trains on the same values
+    predict_risk serves it from read_env_from_mongo.
+    """
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+ROLL_WINDOWS = (3, 7)
+# (source column, output prefix) for the rolling features
+ROLL_COLUMNS = (("PM2_5_mean", "pm25_mean"), ("AQI", "aqi"))
+
+# Lag / trend / rolling columns; NaN in any of them means not enough history for the row
+HISTORY_COLS = [
+    "pm25_mean_lag1", "pm25_max_lag1", "aqi_lag1", "pollen_lag1", "pm25_delta",
+] + [f"{prefix}_roll{win}_{stat}" for win in ROLL_WINDOWS for _, prefix in ROLL_COLUMNS for stat in ("mean", "max")]
+
+def _single_location(df: pd.DataFrame) -> bool:
+    """True when every row has the same (non-null) location_id."""
+    loc = df["location_id"].to_numpy()
+    return len(loc) > 0 and pd.notna(loc[0]) and bool((loc == loc[0]).all())
+
+
+def _ungroup(s: pd.Series, in_order: bool) -> pd.Series | np.ndarray:
+    """
+    Strip the location_id level groupby().rolling() adds; plain rolling results pass through.
+    With in_order (frame already sorted by location_id, no null ids) rows come back in frame
+    order, so the bare values are returned and assignment skips index alignment.
+    """
+    if not isinstance(s.index, pd.MultiIndex):
+        return s
+    return s.to_numpy() if in_order else s.droplevel(0)
+
+
 def feature_engineer(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
+    # Shallow copy: new/replaced columns get their own arrays, the caller's data is not duplicated
+    out = df.copy(deep=False)
 
+    # Column math below runs on the raw arrays (no index alignment per op)
     # ---- pollen_total + missing flags ----
     for c in ["pollen_tree", "pollen_grass", "pollen_weed"]:
         if c not in out.columns:
             out[c] = pd.NA
-        out[c + "_missing"] = out[c].isna().astype(int)
+        vals = out[c].to_numpy()
+        missing = np.isnan(vals) if vals.dtype.kind == "f" else pd.isna(vals)
+        out[c + "_missing"] = missing.view(np.uint8)
         out[c] = out[c].fillna(0)
 
-    out["pollen_total"] = out["pollen_tree"] + out["pollen_grass"] + out["pollen_weed"]
+    pollen_total = (
+        out["pollen_tree"].to_numpy() + out["pollen_grass"].to_numpy() + out["pollen_weed"].to_numpy()
+    )
+    out["pollen_total"] = pollen_total
 
     # ---- temp swing ----
-    out["temp_swing"] = out["temp_max"] - out["temp_min"]
+    out["temp_swing"] = out["temp_max"].to_numpy() - out["temp_min"].to_numpy()
 
     # ---- interactions ----
-    out["pm25_x_humidity"] = out["PM2_5_mean"] * out["humidity"]
-    out["pollen_x_wind"] = out["pollen_total"] * out["wind"]
+    out["pm25_x_humidity"] = out["PM2_5_mean"].to_numpy() * out["humidity"].to_numpy()
+    out["pollen_x_wind"] = pollen_total * out["wind"].to_numpy()
 
     # ---- lags / trends / rolling windows per location ----
-    g = out.groupby("location_id", group_keys=False)
+    # A single location needs no groupby split/concat: shift/roll the columns directly
+    g = out if _single_location(out) else out.groupby("location_id", group_keys=False)
 
     # Lag features
     out["pm25_mean_lag1"] = g["PM2_5_mean"].shift(1)
@@ -147,22 +250,28 @@ def feature_engineer(df: pd.DataFrame) -> pd.DataFrame:
     out["pm25_delta"] = out["PM2_5_mean"] - out["pm25_mean_lag1"]
 
     # Rolling stats (mean + max)
-    for win in [3, 7]:
-        out[f"pm25_mean_roll{win}_mean"] = (
-            g["PM2_5_mean"].rolling(win).mean().reset_index(level=0, drop=True)
-        )
-        out[f"pm25_mean_roll{win}_max"] = (
-            g["PM2_5_mean"].rolling(win).max().reset_index(level=0, drop=True)
-        )
-        out[f"aqi_roll{win}_mean"] = (
-            g["AQI"].rolling(win).mean().reset_index(level=0, drop=True)
-        )
-        out[f"aqi_roll{win}_max"] = (
-            g["AQI"].rolling(win).max().reset_index(level=0, drop=True)
-        )
+    in_order = out["location_id"].is_monotonic_increasing
+    for win in ROLL_WINDOWS:
+        out[f"pm25_mean_roll{win}_mean"] = _ungroup(g["PM2_5_mean"].rolling(win).mean(), in_order)
+        out[f"pm25_mean_roll{win}_max"] = _ungroup(g["PM2_5_mean"].rolling(win).max(), in_order)
+        out[f"aqi_roll{win}_mean"] = _ungroup(g["AQI"].rolling(win).mean(), in_order)
+        out[f"aqi_roll{win}_max"] = _ungroup(g["AQI"].rolling(win).max(), in_order)
+
+    # Drop rows without enough history for lag/rolling features (NaNs elsewhere, e.g. zip_code or
+    # a missing weather reading, are handled natively by the HistGradientBoosting model)
+    out = out.dropna(subset=HISTORY_COLS).reset_index(drop=True)
+    return out
 
-    # Drop rows without enough history for lag/rolling features
-    out = out.dropna().reset_index(drop=True)
+
+def _next_in_group(keys: pd.Series) -> np.ndarray:
+    """Row position of the next row with the same (non-null) key, or -1; like groupby().shift(-1)."""
+    codes, _ = pd.factorize(keys)
+    n = len(codes)
+    order = np.arange(n) if n < 2 or (codes[1:] >= codes[:-1]).all() else np.argsort(codes, kind="stable")
+    cur, nxt = order[:-1], order[1:]
+    same = (codes[cur] == codes[nxt]) & (codes[cur] >= 0)
+    out = np.full(n, -1, dtype=np.intp)
+    out[cur[same]] = nxt[same]
     return out
 
 
@@ -170,24 +279,33 @@ def make_label_high_risk_tomorrow(df: pd.DataFrame) -> pd.DataFrame:
     """
     y_t is defined by thresholds at day t+1, aligned to features at day t.
     """
-    out = df.copy()
-    g = out.groupby("location_id", group_keys=False)
-
-    # Tomorrow's conditions
-    out["AQI_tomorrow"] = g["AQI"].shift(-1)
-    out["PM2_5_mean_tomorrow"] = g["PM2_5_mean"].shift(-1)
-    out["pollen_total_tomorrow"] = g["pollen_total"].shift(-1)
+    out = df.copy(deep=False)
+    nxt = _next_in_group(out["location_id"])
+    has_next = nxt >= 0
+
+    # Tomorrow's conditions (NaN on each location's last day)
+    keep = has_next.copy()
+    for col, src in (
+        ("AQI_tomorrow", "AQI"),
+        ("PM2_5_mean_tomorrow", "PM2_5_mean"),
+        ("pollen_total_tomorrow", "pollen_total"),
+    ):
+        vals = out[src].to_numpy()
+        vals = vals if vals.dtype.kind == "f" else vals.astype(np.float64)
+        tomorrow = np.full(len(vals), np.nan, dtype=vals.dtype)
+        tomorrow[has_next] = vals[nxt[has_next]]
+        out[col] = tomorrow
+        keep &= ~np.isnan(tomorrow)
 
     # Binary label: "high risk tomorrow"
     out["y"] = (
-        (out["AQI_tomorrow"] >= AQI_HIGH)
-        | (out["PM2_5_mean_tomorrow"] >= PM25_HIGH)
-        | (out["pollen_total_tomorrow"] >= POLLEN_HIGH)
-    ).astype(int)
+        (out["AQI_tomorrow"].to_numpy() >= AQI_HIGH)
+        | (out["PM2_5_mean_tomorrow"].to_numpy() >= PM25_HIGH)
+        | (out["pollen_total_tomorrow"].to_numpy() >= POLLEN_HIGH)
+    ).view(np.uint8)
 
     # Last day per location has no tomorrow label
-    out = out.dropna(subset=["AQI_tomorrow", "PM2_5_mean_tomorrow", "pollen_total_tomorrow"]).reset_index(drop=True)
-    return out
+    return out[keep].reset_index(drop=True)
 
 
 def time_series_train_test_split(df: pd.DataFrame, train_frac: float = 0.8):
@@ -213,13 +331,33 @@ def precision_at_k(y_true, y_proba, top_frac: float = 0.2) -> float:
     """
     Precision@K where K is top_frac of days ranked by predicted risk.
     """
+    y_true = np.asarray(y_true)
+    y_proba = np.asarray(y_proba)
     n = len(y_true)
     k = max(1, int(math.ceil(n * top_frac)))
-    idx = pd.Series(y_proba).sort_values(ascending=False).index[:k]
-    return float(pd.Series(y_true).iloc[idx].mean())
+    # Top-k only needs a partition, not a full sort
+    idx = np.argpartition(-y_proba, k - 1)[:k]
+    return float(y_true[idx].mean())
 
 
-def train_and_evaluate(df: pd.DataFrame):
+def _top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first."""
+    k = min(k, len(values))
+    idx = np.argpartition(-values, k - 1)[:k]
+    return idx[np.argsort(-values[idx], kind="stable")]
+
+
+def train_and_evaluate(
+    df: pd.DataFrame, fitted: HistGradientBoostingClassifier | None = None
+) -> HistGradientBoostingClassifier:
+    """
+    Fit (or reuse `fitted`, trained on this same df) and report test metrics; returns the model.
+
+    The model takes the raw feature frame: HGB handles NaN natively and splits on the
+    category-dtype columns directly, so there is no imputer/encoder step. Callers must pass
+    the same columns (model.feature_names_in_); categorical ones (model.is_categorical_)
+    may be category, object or int dtype at predict time.
+    """
     # Choose feature columns (exclude raw tomorrow columns, target, and some IDs)
     drop_cols = {
         "y",
@@ -232,43 +370,31 @@ def train_and_evaluate(df: pd.DataFrame):
         cat_cols.append("location_id")
 
     feature_cols = [c for c in df.columns if c not in drop_cols and c != "date"]
-    X = df[feature_cols]
-    y = df["y"].astype(int)
-
-    numeric_cols = [c for c in feature_cols if c not in cat_cols]
-
-    preprocess = ColumnTransformer(
-        transformers=[
-            ("num", Pipeline([
-                ("imputer", SimpleImputer(strategy="median")),
-            ]), numeric_cols),
-            ("cat", Pipeline([
-                ("imputer", SimpleImputer(strategy="most_frequent")),
-                ("onehot", OneHotEncoder(handle_unknown="ignore")),
-            ]), cat_cols),
-        ],
-        remainder="drop",
-    )
+    df = df.astype({c: "category" for c in cat_cols})
 
     model = HistGradientBoostingClassifier(
         max_depth=4,
         learning_rate=0.06,
         max_iter=400,
+        # Stop once validation ROC-AUC stalls instead of always running max_iter rounds
+        early_stopping=True,
+        validation_fraction=0.1,
+        n_iter_no_change=20,
+        scoring="roc_auc",
         random_state=42,
+        categorical_features=cat_cols,
     )
 
-    pipe = Pipeline([
-        ("preprocess", preprocess),
-        ("model", model),
-    ])
-
     train_df, test_df = time_series_train_test_split(df, TRAIN_FRAC)
 
     X_train, y_train = train_df[feature_cols], train_df["y"].astype(int)
     X_test, y_test = test_df[feature_cols], test_df["y"].astype(int)
 
-    pipe.fit(X_train, y_train)
-    proba_test = pipe.predict_proba(X_test)[:, 1]
+    if fitted is not None:
+        model = fitted
+    else:
+        model.fit(X_train, y_train)
+    proba_test = model.predict_proba(X_test)[:, 1]
 
     # Metrics
     roc = roc_auc_score(y_test, proba_test) if y_test.nunique() > 1 else float("nan")
@@ -287,21 +413,54 @@ def train_and_evaluate(df: pd.DataFrame):
     print("  Brier score:   <0.15 good, <0.10 very good. Lower = better calibrated probabilities.")
     print("  Positive rate: 0.1–0.5 is healthy; 0 or 1.0 means labels may be too strict or too loose.")
 
-    joblib.dump(pipe, "risk_model_general.joblib")
+    joblib.dump(model, "risk_model_general.joblib", compress=3)
     print("\nSaved model: risk_model_general.joblib")
 
     # Optional: show top predicted days for sanity
-    preview = test_df[["date"]].copy()
-    preview["pred_risk"] = proba_test
-    preview["y_true"] = y_test.values
+    top = _top_k_desc(proba_test, 10)
+    preview = pd.DataFrame({
+        "date": test_df["date"].to_numpy()[top],
+        "pred_risk": proba_test[top],
+        "y_true": y_test.to_numpy()[top],
+    })
     print("\nTop 10 highest predicted-risk test days:")
-    print(preview.sort_values("pred_risk", ascending=False).head(10).to_string(index=False))
+    print(preview.to_string(index=False))
+    return model
+
+
+def _data_signature() -> str:
+    """
+    Short hash of everything the labeled frame and fit depend on: collection size and latest
+    date for the query, label thresholds, TRAIN_FRAC and this file's mtime (code changes).
+    In-place edits to older documents that keep count and latest date are not detected.
+    """
+    client = MongoClient(MONGO_URI)
+    coll = client[DB_NAME][COLL_NAME]
+    query = {"location_id": LOCATION_ID} if LOCATION_ID else {}
+    count = coll.count_documents(query)
+    latest = next(coll.find(query, {"date": 1, "_id": 0}).sort("date", -1).limit(1), {}).get("date")
+    key = (
+        DB_NAME, COLL_NAME, query, count, str(latest),
+        AQI_HIGH, PM25_HIGH, POLLEN_HIGH, TRAIN_FRAC, Path(__file__).stat().st_mtime,
+    )
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:16]
 
 
 def main():
-    raw = read_env_from_mongo()
-    fe = feature_engineer(raw)
-    labeled = make_label_high_risk_tomorrow(fe)
+    sig = _data_signature() if USE_CACHE else None
+    labeled_path = CACHE_DIR / f"labeled_{sig}.joblib"
+    model_path = CACHE_DIR / f"model_{sig}.joblib"
+
+    if sig and labeled_path.exists():
+        print(f"Using cached features: {labeled_path}")
+        labeled = joblib.load(labeled_path)
+    else:
+        raw = _categorize(read_env_from_mongo())
+        fe = feature_engineer(raw)
+        labeled = make_label_high_risk_tomorrow(fe)
+        if sig:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            joblib.dump(labeled, labeled_path)
 
     # Basic sanity checks
     if labeled["y"].nunique() < 2:
@@ -310,7 +469,11 @@ def main():
             "Try lowering POLLEN_HIGH or check whether AQI/PM2.5 thresholds are too strict for your data."
         )
 
-    train_and_evaluate(labeled)
+    fitted = joblib.load(model_path) if sig and model_path.exists() else None
+    model = train_and_evaluate(labeled, fitted)
+    if sig and fitted is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, model_path)
 
 
 if __name__ == "__main__":
@@ -17,25 +17,30 @@ import argparse
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from pathlib import Path
 
 # Bootstrap .env and path
+DOTENV_FLAG = "_TIDAL_DOTENV_LOADED"
+
+
 def _bootstrap():
-    try:
-        from dotenv import load_dotenv
-        root = Path(__file__).resolve().parent.parent.parent.parent
-        for p in [root / ".env", Path.cwd() / ".env"]:
-            if p.exists():
-                load_dotenv(p)
-                break
-    except ImportError:
-        pass
     tidal = Path(__file__).resolve().parent.parent.parent.parent
-    if str(tidal) not in sys.path:
-        sys.path.insert(0, str(tidal))
-    if str(tidal / "asthma-forecaster") not in sys.path:
-        sys.path.insert(0, str(tidal / "asthma-forecaster"))
+    # .env is loaded once per process tree (children inherit the env); later modules skip the lookups
+    if not os.environ.get(DOTENV_FLAG):
+        os.environ[DOTENV_FLAG] = "1"
+        try:
+            from dotenv import load_dotenv
+            for p in [tidal / ".env", Path.cwd() / ".env"]:
+                if p.exists():
+                    load_dotenv(p)
+                    break
+        except ImportError:
+            pass
+    for p in (str(tidal), str(tidal / "asthma-forecaster")):
+        if p not in sys.path:
+            sys.path.insert(0, p)
 
 
 _bootstrap()
@@ -43,9 +48,35 @@ _bootstrap()
 import pandas as pd
 
 # Pull uses asthma-forecaster apps
-from pull_by_location_date import pull_all
+from pull_by_location_date import pull_all_cached, get_zipcode_from_coordinates
 from apps.db.daily_dataset import pull_result_to_daily_row, location_id as _loc_id
 
+# Concurrent pull_all calls per fetch (one per day, capped)
+MAX_FETCH_WORKERS = 8
+
+
+def _json_default(obj):
+    """Dates as YYYY-MM-DD; anything else unknown as str."""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()[:10]
+    return str(obj)
+
+
+try:
+    import orjson
+
+    def _dumps_indented(obj) -> str:
+        """Indented JSON via orjson (numpy scalars serialize natively)."""
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME,
+            default=_json_default,
+        ).decode()
+except ImportError:
+    def _dumps_indented(obj) -> str:
+        """Indented JSON (stdlib fallback when orjson is not installed)."""
+        return json.dumps(obj, indent=2, default=_json_default)
+
 
 def _season_string(month: int) -> str:
     """Return season name for flare schema (winter, spring, summer, fall)."""
@@ -122,19 +153,24 @@ def fetch_week_data(
     Fetch `days` days of data starting at `start_date` using API keys (pull_all per day).
     Returns a list of dicts in the flare schema (locationid, date, PM2_5_mean, etc.).
     """
-    rows = []
-    for i in range(days):
-        d = start_date + timedelta(days=i)
-        result = pull_all(
+    if zip_code is None:
+        # Reverse-geocode once rather than once per day (pull_all does it when zip is missing)
+        zip_code = get_zipcode_from_coordinates(latitude, longitude)
+
+    def _pull(d: date) -> dict:
+        return pull_all_cached(
             latitude=latitude,
             longitude=longitude,
             zip_code=zip_code,
             target_date=d,
             include_raw=include_raw,
         )
-        row = pull_result_to_week_row(result)
-        rows.append(row)
-    return rows
+
+    # Days are independent network round-trips; fetch them concurrently (map keeps date order)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    with ThreadPoolExecutor(max_workers=max(1, min(days, MAX_FETCH_WORKERS))) as ex:
+        results = list(ex.map(_pull, dates))
+    return [pull_result_to_week_row(r) for r in results]
 
 
 def fetch_week_dataframe(
@@ -154,7 +190,8 @@ def fetch_week_dataframe(
         zip_code=zip_code,
     )
     df = pd.DataFrame(rows)
-    df["date"] = pd.to_datetime(df["date"])
+    # Rows carry date.isoformat() strings
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
     # Alias for predict_flare (accepts location_id or locationid)
     if "locationid" in df.columns and "location_id" not in df.columns:
         df["location_id"] = df["locationid"].str.replace("-", "_", n=1)
@@ -186,14 +223,7 @@ def main():
         zip_code=args.zip_code,
     )
     if args.json:
-        # Strip non-JSON types for clean output
-        out = []
-        for r in rows:
-            o = dict(r)
-            if "date" in o and hasattr(o["date"], "isoformat"):
-                o["date"] = o["date"].isoformat()[:10] if hasattr(o["date"], "date") else str(o["date"])[:10]
-            out.append(o)
-        print(json.dumps(out, indent=2))
+        print(_dumps_indented(rows))
     else:
         df = pd.DataFrame(rows)
         print(df.to_string(index=False))
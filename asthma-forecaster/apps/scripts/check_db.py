@@ -14,11 +14,17 @@ except ImportError:
 
 def main():
     try:
+        from pymongo.errors import OperationFailure
         from db.daily_dataset import get_collection
         coll = get_collection()
         db_name = coll.database.name
         coll_name = coll.name
-        n = coll.count_documents({})
+        try:
+            # Approximate count from collection metadata (no scan)
+            n = coll.estimated_document_count()
+        except OperationFailure:
+            # Time-series collections are views; the count command is not available on them
+            n = coll.count_documents({})
         # Mask URI for display
         uri = os.environ.get("MONGODB_URI", "")
         if "@" in uri:
@@ -28,7 +34,8 @@ def main():
         print(f"Connected: {uri}")
         print(f"Database: {db_name!r}  Collection: {coll_name!r}  ->  {n} document(s)")
         if n > 0:
-            for doc in coll.find({}).sort("date", 1).limit(5):
+            preview = {"date": 1, "location_id": 1, "AQI": 1, "season": 1, "_id": 0}
+            for doc in coll.find({}, preview).sort("date", 1).limit(5).hint([("date", 1)]):
                 print(f"  - {doc.get('date')} | location_id={doc.get('location_id')} | AQI={doc.get('AQI')} | season={doc.get('season')}")
         else:
             print("No documents. Run: python3 pull_by_location_date.py --lat 37.77 --lon -122.42 --date 2025-02-07 --no-raw --mongodb")
@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
 try:
@@ -21,7 +22,7 @@ try:
 except ImportError:
     pass
 
-from pull_by_location_date import pull_all
+from pull_by_location_date import pull_all_cached, get_zipcode_from_coordinates
 
 # Add the asthma-forecaster directory to Python path
 import sys
@@ -30,6 +31,9 @@ sys.path.append(str(Path(__file__).parent / "asthma-forecaster"))
 
 from apps.db.daily_dataset import get_collection, insert_many_daily_rows
 
+# Concurrent pull_all calls per batch
+MAX_WORKERS = 8
+
 
 def main():
     parser = argparse.ArgumentParser(description="Backfill daily rows to MongoDB")
@@ -38,7 +42,7 @@ def main():
     parser.add_argument("--zip", dest="zip_code", type=str, help="ZIP code (US)")
     parser.add_argument("--start", type=str, required=True, help="Start date YYYY-MM-DD")
     parser.add_argument("--end", type=str, required=True, help="End date YYYY-MM-DD")
-    parser.add_argument("--batch", type=int, default=7, help="Upsert in batches of N (default 7)")
+    parser.add_argument("--batch", type=int, default=200, help="Upsert in batches of N days (default 200)")
     args = parser.parse_args()
 
     if not args.zip_code and (args.lat is None or args.lon is None):
@@ -52,27 +56,32 @@ def main():
     if start > end:
         parser.error("--start must be <= --end")
 
+    zip_code = args.zip_code
+    if zip_code is None:
+        # Reverse-geocode once rather than once per day (pull_all does it when zip is missing)
+        zip_code = get_zipcode_from_coordinates(args.lat, args.lon)
+
+    def _pull(d: date) -> dict:
+        return pull_all_cached(
+            latitude=args.lat,
+            longitude=args.lon,
+            zip_code=zip_code,
+            target_date=d,
+            include_raw=False,
+        )
+
     coll = get_collection()
     total = 0
     current = start
-    while current <= end:
-        batch_end = min(current + timedelta(days=args.batch - 1), end)
-        results = []
-        d = current
-        while d <= batch_end:
-            result = pull_all(
-                latitude=args.lat,
-                longitude=args.lon,
-                zip_code=args.zip_code,
-                target_date=d,
-                include_raw=False,
-            )
-            results.append(result)
-            d += timedelta(days=1)
-        n = insert_many_daily_rows(results, coll=coll)
-        total += n
-        print(f"  {current} .. {batch_end}: {n} rows", file=sys.stderr)
-        current = batch_end + timedelta(days=1)
+    with ThreadPoolExecutor(max_workers=max(1, min(args.batch, MAX_WORKERS))) as ex:
+        while current <= end:
+            batch_end = min(current + timedelta(days=args.batch - 1), end)
+            days = [current + timedelta(days=i) for i in range((batch_end - current).days + 1)]
+            results = list(ex.map(_pull, days))
+            n = insert_many_daily_rows(results, coll=coll)
+            total += n
+            print(f"  {current} .. {batch_end}: {n} rows", file=sys.stderr)
+            current = batch_end + timedelta(days=1)
 
     print(f"Done: {total} rows upserted", file=sys.stderr)
 
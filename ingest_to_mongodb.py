@@ -10,12 +10,14 @@ Usage:
   python ingest_to_mongodb.py --lat 37.77 --lon -122.42 --date 2025-02-07
   python ingest_to_mongodb.py --lat 37.77 --lon -122.42 --start 2025-02-01 --end 2025-02-07
   python ingest_to_mongodb.py --zip 94102 --date 2025-02-07
+  python ingest_to_mongodb.py --batch-file rows.csv   # one lat,lon,YYYY-MM-DD per line
 """
 from __future__ import annotations
 
 import argparse
 import os
-from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 
 try:
     from dotenv import load_dotenv
@@ -23,9 +25,30 @@ try:
 except ImportError:
     pass
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
 
-from pull_by_location_date import pull_all
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+from pull_by_location_date import pull_all, get_zipcode_from_coordinates
+
+# Concurrent pull_all calls for a date range
+MAX_WORKERS = 8
+# Progress line every N pulled days when tqdm is not installed
+PROGRESS_EVERY = 50
+# Upserts per bulk_write while pulling
+WRITE_BATCH = 500
+
+# Pool sized above MAX_WORKERS; wire compression is negotiated with the server in this order
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": 32,
+    "minPoolSize": 4,
+    "retryWrites": True,
+    "compressors": "zstd,snappy,zlib",
+}
 
 
 def location_key(lat: float | None, lon: float | None, zip_code: str | None) -> str:
@@ -36,45 +59,88 @@ def location_key(lat: float | None, lon: float | None, zip_code: str | None) ->
     return "unknown"
 
 
-def ingest_one(
+def build_update_op(
     *,
     latitude: float | None,
     longitude: float | None,
     zip_code: str | None,
     target_date: date,
-    db,
     include_raw: bool = False,
-) -> bool:
+    ingested_at: datetime | None = None,
+    key: str | None = None,
+    skip_zip_lookup: bool = False,
+) -> UpdateOne:
+    """Pull one day of data and return its environment_daily upsert (not yet written).
+    Pass ingested_at / key to share one timestamp and location key across a batch."""
     data = pull_all(
         latitude=latitude,
         longitude=longitude,
         zip_code=zip_code,
         target_date=target_date,
         include_raw=include_raw,
+        skip_zip_lookup=skip_zip_lookup,
     )
-    key = location_key(latitude, longitude, zip_code)
-    doc = {
-        "locationKey": key,
-        "date": target_date.isoformat(),
-        "latitude": data["location"].get("latitude"),
-        "longitude": data["location"].get("longitude"),
-        "zipCode": data["location"].get("zip_code"),
+    if key is None:
+        key = location_key(latitude, longitude, zip_code)
+    day = target_date.isoformat()
+    # locationKey/date come from the upsert filter; coordinates never change for a key,
+    # so only the per-day payload is rewritten when the document already exists
+    to_set = {
         "air_quality": data["air_quality"],
         "weather": data["weather"],
         "pollen": data["pollen"],
         "time_context": data["time_context"],
-        "ingestedAt": datetime.utcnow(),
+        "ingestedAt": ingested_at or datetime.now(timezone.utc),
     }
-
-    coll = db.environment_daily
-    coll.update_one(
-        {"locationKey": key, "date": doc["date"]},
-        {"$set": doc},
+    on_insert = {
+        "latitude": data["location"].get("latitude"),
+        "longitude": data["location"].get("longitude"),
+    }
+    # A missing (skipped or failed) ZIP lookup must not erase one stored by an earlier run
+    zip_found = data["location"].get("zip_code")
+    (to_set if zip_found is not None else on_insert)["zipCode"] = zip_found
+    return UpdateOne(
+        {"locationKey": key, "date": day},
+        {"$set": to_set, "$setOnInsert": on_insert},
         upsert=True,
     )
+
+def ingest_one(
+    *,
+    latitude: float | None,
+    longitude: float | None,
+    zip_code: str | None,
+    target_date: date,
+    db,
+    include_raw: bool = False,
+) -> bool:
+    op = build_update_op(
+        latitude=latitude,
+        longitude=longitude,
+        zip_code=zip_code,
+        target_date=target_date,
+        include_raw=include_raw,
+    )
+    db.environment_daily.bulk_write([op])
     return True
 
 
+def read_batch_file(path: str) -> list[tuple[float, float, date]]:
+    """Parse `lat,lon,YYYY-MM-DD` lines (blank lines and # comments are skipped)."""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                lat, lon, day = (part.strip() for part in line.split(","))
+                rows.append((float(lat), float(lon), date.fromisoformat(day)))
+            except ValueError:
+                raise ValueError(f"line {n}: expected lat,lon,YYYY-MM-DD, got {line!r}") from None
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(description="Ingest TIDAL data into MongoDB")
     parser.add_argument("--lat", type=float, help="Latitude")
@@ -83,51 +149,143 @@ def main():
     parser.add_argument("--date", type=str, help="Single date YYYY-MM-DD")
     parser.add_argument("--start", type=str, help="Start date YYYY-MM-DD (range)")
     parser.add_argument("--end", type=str, help="End date YYYY-MM-DD (range)")
+    parser.add_argument("--batch-file", type=str, help="File of lat,lon,YYYY-MM-DD lines to ingest in one run")
     parser.add_argument("--no-raw", action="store_true", help="Do not store raw API responses")
+    parser.add_argument(
+        "--skip-zip-lookup",
+        action="store_true",
+        help="Don't reverse-geocode lat/lon to a ZIP (locationKey uses lat/lon anyway; AirNow is queried by lat/lon)",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-pull days already in MongoDB (today and yesterday are always re-pulled)")
     parser.add_argument("--db", type=str, default="asthma", help="MongoDB database name")
     args = parser.parse_args()
 
-    if not args.zip_code and (args.lat is None or args.lon is None):
-        parser.error("Provide either --lat and --lon or --zip")
+    if args.batch_file:
+        try:
+            jobs = [(lat, lon, None, d) for lat, lon, d in read_batch_file(args.batch_file)]
+        except (OSError, ValueError) as e:
+            parser.error(f"--batch-file: {e}")
+    else:
+        if not args.zip_code and (args.lat is None or args.lon is None):
+            parser.error("Provide either --lat and --lon or --zip")
+
+        if args.date:
+            try:
+                start_d = end_d = date.fromisoformat(args.date)
+            except ValueError:
+                parser.error("--date must be YYYY-MM-DD")
+        elif args.start and args.end:
+            try:
+                start_d = date.fromisoformat(args.start)
+                end_d = date.fromisoformat(args.end)
+                if start_d > end_d:
+                    start_d, end_d = end_d, start_d
+            except ValueError:
+                parser.error("--start and --end must be YYYY-MM-DD")
+        else:
+            parser.error("Provide --date or both --start and --end")
+
+        dates = [start_d + timedelta(days=i) for i in range((end_d - start_d).days + 1)]
+        jobs = [(args.lat, args.lon, args.zip_code, d) for d in dates]
 
     uri = os.environ.get("MONGODB_URI")
     if not uri:
         print("Set MONGODB_URI in .env")
         return 1
 
-    if args.date:
-        try:
-            start_d = end_d = date.fromisoformat(args.date)
-        except ValueError:
-            parser.error("--date must be YYYY-MM-DD")
-    elif args.start and args.end:
-        try:
-            start_d = date.fromisoformat(args.start)
-            end_d = date.fromisoformat(args.end)
-            if start_d > end_d:
-                start_d, end_d = end_d, start_d
-        except ValueError:
-            parser.error("--start and --end must be YYYY-MM-DD")
-    else:
-        parser.error("Provide --date or both --start and --end")
+    if not jobs:
+        print("Nothing to ingest.")
+        return 0
 
-    client = MongoClient(uri)
-    db = client[args.db]
+    client = MongoClient(uri, **MONGO_CLIENT_OPTIONS)
+    coll = client[args.db].environment_daily
+    try:
+        # Each upsert filters on (locationKey, date); without this index every one is a collection scan
+        coll.create_index([("locationKey", ASCENDING), ("date", ASCENDING)], unique=True)
+    except OperationFailure as e:
+        print(f"Warning: could not create (locationKey, date) index: {e}")
     include_raw = not args.no_raw
 
-    d = start_d
-    while d <= end_d:
-        ingest_one(
-            latitude=args.lat,
-            longitude=args.lon,
-            zip_code=args.zip_code,
+    # Key each location once; the key prefers lat/lon, so it never depends on a looked-up zip
+    keys = {loc: location_key(*loc) for loc in {job[:3] for job in jobs}}
+
+    if not args.force:
+        # Skip (location, day) pairs already stored so re-runs don't call the APIs again. Only days
+        # before yesterday count as final (as in pull_all_cached); recent days are always refreshed.
+        final_before = date.today() - timedelta(days=1)
+        wanted = {}
+        for lat, lon, zip_code, d in jobs:
+            if d < final_before:
+                wanted.setdefault(keys[(lat, lon, zip_code)], []).append(d.isoformat())
+        existing = set()
+        if wanted:
+            existing = {
+                (doc["locationKey"], doc["date"])
+                for doc in coll.find(
+                    {"$or": [{"locationKey": k, "date": {"$in": days}} for k, days in wanted.items()]},
+                    {"_id": 0, "locationKey": 1, "date": 1},
+                )
+            }
+        if existing:
+            n_requested = len(jobs)
+            jobs = [job for job in jobs if (keys[job[:3]], job[3].isoformat()) not in existing]
+            print(f"Skipping {n_requested - len(jobs)} already-ingested day(s) (use --force to re-pull)")
+        if not jobs:
+            print("Nothing to ingest.")
+            return 0
+
+    # Reverse-geocode each location once rather than once per day (pull_all looks up a missing zip)
+    zips = {}
+    for lat, lon, zip_code, _ in jobs:
+        if (lat, lon, zip_code) not in zips:
+            resolved = zip_code
+            if resolved is None and not args.skip_zip_lookup:
+                resolved = get_zipcode_from_coordinates(lat, lon)
+            zips[(lat, lon, zip_code)] = resolved
+
+    ingested_at = datetime.now(timezone.utc)
+
+    def _build(job: tuple) -> UpdateOne:
+        lat, lon, zip_code, d = job
+        return build_update_op(
+            latitude=lat,
+            longitude=lon,
+            zip_code=zips[(lat, lon, zip_code)],
             target_date=d,
-            db=db,
             include_raw=include_raw,
+            ingested_at=ingested_at,
+            key=keys[(lat, lon, zip_code)],
+            skip_zip_lookup=args.skip_zip_lookup,
         )
-        print(f"Ingested {d.isoformat()}")
-        d += timedelta(days=1)
 
+    # Each (location, day) is independent HTTP I/O; pull them concurrently. Upserts are flushed
+    # every WRITE_BATCH days so an interrupted run keeps what it already pulled. Rows are
+    # independent upserts, so order doesn't matter.
+    ops = []
+    n_written = n_inserted = n_updated = 0
+
+    def _flush() -> None:
+        nonlocal n_written, n_inserted, n_updated
+        if ops:
+            res = coll.bulk_write(ops, ordered=False)
+            n_written += len(ops)
+            n_inserted += res.upserted_count
+            n_updated += res.modified_count
+            ops.clear()
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), MAX_WORKERS)) as ex:
+        pulled = ex.map(_build, jobs)
+        if tqdm is not None:
+            pulled = tqdm(pulled, total=len(jobs), desc="Pulling", unit="day")
+        for n, op in enumerate(pulled, 1):
+            ops.append(op)
+            if len(ops) >= WRITE_BATCH:
+                _flush()
+            if tqdm is None and (n % PROGRESS_EVERY == 0 or n == len(jobs)):
+                print(f"Pulled {n}/{len(jobs)}")
+    _flush()
+
+    print(f"Ingested {n_written} day(s): {n_inserted} inserted, {n_updated} updated")
     print("Done.")
     return 0
 
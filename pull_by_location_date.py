@@ -18,10 +18,15 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sqlite3
 import sys
-from datetime import date
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import closing, suppress
+from datetime import date, timedelta
+from functools import lru_cache
 from pathlib import Path
-import requests
 
 # Load .env only (not .env.example)
 try:
@@ -40,42 +45,122 @@ sys.path.append(str(Path(__file__).parent / "asthma-forecaster"))
 from apps.data_sources.air_quality import pull_air_quality
 from apps.data_sources.weather import pull_noaa_weather
 from apps.data_sources.pollen import pull_pollen
-from apps.data_sources.time_context import pull_time_context
+from apps.data_sources.time_context import pull_time_context as _pull_time_context
+from apps.data_sources.http import json_body, session
+
+# Derived purely from the date, so memoized per date
+_time_context_cached = lru_cache(maxsize=512)(_pull_time_context)
+
+
+def pull_time_context(target_date: date) -> dict:
+    """Memoized time context; each call gets its own copy so callers can't mutate the cache."""
+    return dict(_time_context_cached(target_date))
+
+
+# In-process memo for pollen / air quality, keyed on (source, round(lat, 2), round(lon, 2), zip, date).
+# Unlike pull_all_cached (exact coordinates), the 2-decimal key deliberately lets points ~1 km
+# apart share a result: both sources are gridded/station data coarser than that.
+# Only error-free results are kept so transient API failures are retried.
+SOURCE_CACHE_SIZE = 1024
+_source_cache: dict[tuple, dict] = {}
+_source_lock = threading.Lock()
+
+
+def _cached_source(fn, *, latitude, longitude, target_date, **kwargs) -> dict:
+    key = (
+        fn.__name__,
+        None if latitude is None else round(latitude, 2),
+        None if longitude is None else round(longitude, 2),
+        tuple(sorted(kwargs.items())),
+        target_date,
+    )
+    with _source_lock:
+        hit = _source_cache.get(key)
+    if hit is not None:
+        return dict(hit)
+    result = fn(latitude=latitude, longitude=longitude, target_date=target_date, **kwargs)
+    if not result.get("error"):
+        with _source_lock:
+            if len(_source_cache) >= SOURCE_CACHE_SIZE:
+                _source_cache.pop(next(iter(_source_cache)))
+            _source_cache[key] = result
+    return dict(result)
+
+# Reverse-geocode cache: (lat, lon) rounded to 4 decimals -> ZIP, kept for 30 days
+NOMINATIM_CACHE_PATH = Path(os.getenv("NOMINATIM_CACHE") or Path.home() / ".cache" / "tidal" / "nominatim.db")
+NOMINATIM_CACHE_TTL = 30 * 24 * 3600
+# Nominatim regularly takes >10 s under load; timing out earlier just triggers another request
+NOMINATIM_TIMEOUT = 15
+
+
+def _zip_cache_get(key: str) -> tuple[bool, str | None]:
+    """(found, zip_code) from the on-disk cache; expired or unreadable entries count as missing."""
+    try:
+        with closing(sqlite3.connect(NOMINATIM_CACHE_PATH)) as conn:
+            row = conn.execute("SELECT zip, ts FROM zips WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return False, None
+    if row is None or time.time() - row[1] > NOMINATIM_CACHE_TTL:
+        return False, None
+    return True, row[0]
+
+
+def _zip_cache_put(key: str, zip_code: str | None) -> None:
+    try:
+        NOMINATIM_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(NOMINATIM_CACHE_PATH)) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS zips (key TEXT PRIMARY KEY, zip TEXT, ts REAL)")
+            conn.execute("INSERT OR REPLACE INTO zips VALUES (?, ?, ?)", (key, zip_code, time.time()))
+    except (OSError, sqlite3.Error):
+        pass
+
+
+@lru_cache(maxsize=4096)
+def _zipcode_for(latitude: float, longitude: float) -> str | None:
+    """Disk cache, then Nominatim; raises on request failure so failures are never cached."""
+    key = f"{latitude}_{longitude}"
+    found, zip_code = _zip_cache_get(key)
+    if found:
+        return zip_code
+
+    url = "https://nominatim.openstreetmap.org/reverse"
+    params = {
+        "lat": latitude,
+        "lon": longitude,
+        "format": "json",
+        "addressdetails": 1,
+        "zoom": 18
+    }
+    headers = {
+        "User-Agent": "TIDAL-Environmental-Data/1.0"
+    }
+
+    response = session().get(url, params=params, headers=headers, timeout=NOMINATIM_TIMEOUT)
+    response.raise_for_status()
+
+    data = json_body(response)
+
+    # Try to extract ZIP code from various possible fields
+    address = data.get("address", {})
+    zip_code = (
+        address.get("postcode") or
+        address.get("postal_code") or
+        address.get("zipcode")
+    )
+
+    _zip_cache_put(key, zip_code)
+    return zip_code
 
 
 def get_zipcode_from_coordinates(latitude: float, longitude: float) -> str | None:
     """
     Get ZIP code from latitude/longitude using reverse geocoding.
     Uses OpenStreetMap Nominatim API (free, no API key required).
+    Lookups are cached by (lat, lon) rounded to 4 decimals, in memory and in
+    NOMINATIM_CACHE_PATH for NOMINATIM_CACHE_TTL (Nominatim allows ~1 req/s).
     """
     try:
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            "lat": latitude,
-            "lon": longitude,
-            "format": "json",
-            "addressdetails": 1,
-            "zoom": 18
-        }
-        headers = {
-            "User-Agent": "TIDAL-Environmental-Data/1.0"
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Try to extract ZIP code from various possible fields
-        address = data.get("address", {})
-        zip_code = (
-            address.get("postcode") or 
-            address.get("postal_code") or 
-            address.get("zipcode")
-        )
-        
-        return zip_code
-        
+        return _zipcode_for(round(latitude, 4), round(longitude, 4))
     except Exception as e:
         print(f"Warning: Could not determine ZIP code from coordinates: {e}")
         return None
@@ -88,14 +173,16 @@ def pull_all(
     zip_code: str | None = None,
     target_date: date,
     include_raw: bool = True,
+    skip_zip_lookup: bool = False,
 ) -> dict:
     """
     Pull all data for the given location and date.
     Provide either (latitude, longitude) or zip_code.
-    If coordinates are provided without zip_code, will attempt to lookup zip_code.
+    If coordinates are provided without zip_code, will attempt to lookup zip_code
+    unless skip_zip_lookup (air quality then queries AirNow by lat/lon).
     """
     # If we have coordinates but no zip code, try to get it
-    if latitude is not None and longitude is not None and zip_code is None:
+    if latitude is not None and longitude is not None and zip_code is None and not skip_zip_lookup:
         zip_code = get_zipcode_from_coordinates(latitude, longitude)
     
     out = {
@@ -111,41 +198,112 @@ def pull_all(
         "time_context": None,
     }
 
-    # Air Quality (AirNow or PurpleAir)
-    aq = pull_air_quality(
-        latitude=latitude,
-        longitude=longitude,
-        zip_code=zip_code,
-        target_date=target_date,
-    )
-    out["air_quality"] = _strip_raw(aq) if not include_raw else aq
-
-    # Weather (NOAA) — needs lat/lon
     lat = latitude
     lon = longitude
-    if lat is None or lon is None:
+    has_coords = lat is not None and lon is not None
+
+    # The sources are independent I/O calls, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Air Quality (AirNow or PurpleAir)
+        aq_f = pool.submit(
+            _cached_source,
+            pull_air_quality,
+            latitude=latitude,
+            longitude=longitude,
+            zip_code=zip_code,
+            target_date=target_date,
+        )
+        # Weather (NOAA) and Pollen — need lat/lon
+        w_f = pool.submit(pull_noaa_weather, latitude=lat, longitude=lon, target_date=target_date) if has_coords else None
+        p_f = pool.submit(_cached_source, pull_pollen, latitude=lat, longitude=lon, target_date=target_date) if has_coords else None
+        # Time context (derived)
+        tc_f = pool.submit(pull_time_context, target_date)
+        wait([f for f in (aq_f, w_f, p_f, tc_f) if f is not None])
+
+    aq = aq_f.result()
+    out["air_quality"] = _strip_raw(aq) if not include_raw else aq
+
+    if w_f is None:
         out["weather"] = {"error": "Weather requires latitude and longitude", "source": "NOAA"}
     else:
-        w = pull_noaa_weather(latitude=lat, longitude=lon, target_date=target_date)
+        w = w_f.result()
         out["weather"] = _strip_raw(w) if not include_raw else w
 
-    # Pollen — needs lat/lon
-    if lat is not None and lon is not None:
-        p = pull_pollen(latitude=lat, longitude=lon, target_date=target_date)
+    if p_f is not None:
+        p = p_f.result()
         out["pollen"] = _strip_raw(p) if not include_raw else p
     else:
         out["pollen"] = {"error": "Pollen requires latitude and longitude", "source": "Pollen"}
 
-    # Time context (derived)
-    tc = pull_time_context(target_date)
+    tc = tc_f.result()
     out["time_context"] = _strip_raw(tc) if not include_raw else tc
 
     return out
 
 
+# On-disk cache for pull_all_cached (one JSON file per location + date)
+PULL_CACHE_DIR = Path(os.getenv("PULL_CACHE_DIR") or Path(__file__).resolve().parent / ".pull_cache")
+
+
+def pull_all_cached(
+    *,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    zip_code: str | None = None,
+    target_date: date,
+    include_raw: bool = True,
+) -> dict:
+    """
+    pull_all() backed by a JSON file cache in PULL_CACHE_DIR.
+    Only dates before yesterday are cached (their upstream data no longer changes),
+    and results with an error in any category are never stored.
+    """
+    kwargs = dict(
+        latitude=latitude,
+        longitude=longitude,
+        zip_code=zip_code,
+        target_date=target_date,
+        include_raw=include_raw,
+    )
+    if target_date >= date.today() - timedelta(days=1):
+        return pull_all(**kwargs)
+
+    key = f"{latitude!r}_{longitude!r}_{zip_code or ''}_{target_date.isoformat()}_{int(include_raw)}"
+    path = PULL_CACHE_DIR / f"{key}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+
+    result = pull_all(**kwargs)
+    if not any(isinstance(v, dict) and v.get("error") for v in result.values()):
+        # Write then rename so concurrent readers never see a partial file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            PULL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(result), encoding="utf-8")
+            tmp.replace(path)
+        except (OSError, TypeError, ValueError):
+            # Best effort: an unwritable cache or an unserializable payload must not fail the pull
+            with suppress(OSError):
+                tmp.unlink(missing_ok=True)
+    return result
+
+
 def _strip_raw(d: dict) -> dict:
-    """Remove 'raw' key to keep output small."""
-    return {k: v for k, v in d.items() if k != "raw"}
+    """Remove 'raw' key (in place) to keep output small."""
+    d.pop("raw", None)
+    return d
+
+
+def _write_json(obj, out: str | None) -> None:
+    """Write indented JSON to `out` (or stdout) straight from obj, without an intermediate str."""
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+    else:
+        json.dump(obj, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
 
 def main():
@@ -185,12 +343,9 @@ def main():
         except Exception as e:
             print(f"MongoDB upsert failed: {e}", file=sys.stderr)
 
-    json_str = json.dumps(result, indent=2)
+    _write_json(result, args.out)
     if args.out:
-        Path(args.out).write_text(json_str, encoding="utf-8")
         print(f"Wrote {args.out}")
-    else:
-        print(json_str)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+"""Shared test helpers: import paths and an in-memory stand-in for a MongoDB client."""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for p in (ROOT, ROOT / "asthma-forecaster"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+
+class FakeCollection:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+
+    def find(self, query=None, projection=None, batch_size=None):
+        keep = [k for k, v in (projection or {}).items() if v and k != "_id"]
+        for doc in self.docs:
+            yield {k: doc[k] for k in keep if k in doc} if keep else dict(doc)
+
+
+class FakeMongoClient:
+    """MongoClient(uri)[db][coll] returning the same FakeCollection for every name."""
+
+    def __init__(self, docs: list[dict]):
+        self.coll = FakeCollection(docs)
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getitem__(self, name):
+        return self
+
+    def find(self, *args, **kwargs):
+        return self.coll.find(*args, **kwargs)
+
+
+def daily_docs(start: datetime = datetime(2026, 2, 1), days: int = 14) -> list[dict]:
+    """Daily env rows with values that are not exactly representable in float32."""
+    docs = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        docs.append({
+            "location_id": "37.77_-122.42",
+            "latitude": 37.77,
+            "longitude": -122.42,
+            "zip_code": "94102",
+            "date": d,
+            "PM2_5_mean": 31.28912345 + 3.1 * (i % 5),
+            "PM2_5_max": 44.104 + 4.3 * (i % 5),
+            "AQI": 60 + 17 * (i % 6),
+            "temp_min": 8.907838910845053 + i * 0.01,
+            "temp_max": 17.33 + i * 0.01,
+            "humidity": 61.7,
+            "wind": 4.3,
+            "pressure": 1013.2,
+            "rain": 0.1,
+            "pollen_tree": 2.1 + 1.7 * (i % 4),
+            "pollen_grass": 1.3,
+            "pollen_weed": 0.7,
+            "day_of_week": d.weekday(),
+            "month": d.month,
+            "season": 1,
+            "holiday_flag": 0,
+        })
+    return docs
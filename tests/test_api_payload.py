@@ -0,0 +1,89 @@
+"""The risk / flare API payloads echo env values exactly as stored (no float32 round trip)."""
+from __future__ import annotations
+
+import unittest
+from datetime import date
+from unittest import mock
+
+from tests._fakes import FakeMongoClient, daily_docs
+
+import numpy as np
+import pandas as pd
+
+from apps.ml import predict_flare, predict_risk, trainingModel
+
+DAILY_FLOATS = ("latitude", "longitude", "PM2_5_mean", "PM2_5_max", "temp_min", "temp_max", "humidity")
+
+
+class ReadEnvTest(unittest.TestCase):
+    def test_reader_keeps_float64(self):
+        docs = daily_docs()
+        with mock.patch.object(trainingModel, "MongoClient", FakeMongoClient(docs)):
+            raw = trainingModel.read_env_from_mongo()
+        for c in DAILY_FLOATS:
+            self.assertEqual(raw[c].dtype, np.float64, c)
+            self.assertEqual(raw[c].tolist(), [d[c] for d in docs], c)
+
+
+# Captured from the pre-optimization predict_risk (--week --start 2026-02-08 --days 7) on
+# daily_docs() with the repo's risk_model_general.joblib: (date, score, level, factor ids)
+BASELINE_WEEK = [
+    ("2026-02-08", 5.0, "high", ["pm25", "pollen"]),
+    ("2026-02-09", 1.0, "low", ["pm25"]),
+    ("2026-02-10", 1.1, "low", ["air", "pm25"]),
+    ("2026-02-11", 4.3, "moderate", ["air"]),
+    ("2026-02-12", 5.0, "high", ["air", "pollen"]),
+    ("2026-02-13", 1.0, "low", ["pm25"]),
+    ("2026-02-14", 1.1, "low", ["pm25"]),
+]
+
+
+class RiskWeekPayloadTest(unittest.TestCase):
+    def test_week_payload_matches_baseline(self):
+        docs = daily_docs()
+        predict_risk._FE_CACHE.clear()
+        with mock.patch.object(trainingModel, "MongoClient", FakeMongoClient(docs)):
+            payload = predict_risk._week_payload("2026-02-08", 7)
+
+        got = [
+            (d["date"], d["risk"]["score"], d["risk"]["level"], [f["id"] for f in d["activeRiskFactors"]])
+            for d in payload["days"]
+        ]
+        self.assertEqual(got, BASELINE_WEEK)
+        by_date = {d["date"].strftime("%Y-%m-%d"): d for d in docs}
+        for day in payload["days"]:
+            for c in DAILY_FLOATS:
+                self.assertEqual(day["daily"][c], by_date[day["date"]][c], c)
+
+
+class FlarePayloadTest(unittest.TestCase):
+    def test_flare_matches_float64_baseline(self):
+        import joblib
+
+        path = predict_flare._flare_model_path()
+        if path is None or not path.exists():
+            self.skipTest("flare_model.joblib not available")
+        bundle = predict_flare._prepare_bundle(joblib.load(path))
+        docs = daily_docs()
+        with mock.patch.object(trainingModel, "MongoClient", FakeMongoClient(docs)):
+            raw = trainingModel.read_env_from_mongo()
+        dates = [date(2026, 2, 10), date(2026, 2, 11)]
+        results = predict_flare._predict_dates(dates, raw, bundle, None)
+
+        # Baseline: float64 features through the untouched scaler and model
+        rows = [raw.iloc[9].copy(), raw.iloc[10].copy()]
+        feature_order = bundle["feature_order"]
+        rows = [predict_flare._prepare_row(r, feature_order) for r in rows]
+        encoded = [predict_flare._encode_flare_row(r, bundle.get("le_dow"), bundle.get("le_season")) for r in rows]
+        X = pd.DataFrame([{c: e.get(c, 0.0) for c in feature_order} for e in encoded]).fillna(0).astype(np.float64)
+        probas = bundle["model"].predict_proba(bundle["scaler"].transform(X))[:, 1]
+        scores, _, _ = predict_flare._proba_to_score_level_vec(probas)
+
+        for res, doc, score in zip(results, docs[9:11], scores):
+            self.assertEqual(res["risk"]["score"], round(float(score), 1))
+            for c in ("PM2_5_mean", "PM2_5_max", "temp_min", "temp_max", "humidity"):
+                self.assertEqual(res["daily"][c], doc[c], c)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""pull_all_cached treats its disk cache as best effort."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from tests._fakes import ROOT  # noqa: F401  (sets up import paths)
+
+import pull_by_location_date as pbl
+
+OLD_DATE = date(2024, 1, 15)
+
+
+def _result(**extra) -> dict:
+    return {
+        "location": {"latitude": 1.0, "longitude": 2.0, "zip_code": None},
+        "date": OLD_DATE.isoformat(),
+        "air_quality": {"error": None},
+        **extra,
+    }
+
+
+class PullAllCachedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _pull(self, cache_dir: Path, result: dict) -> dict:
+        with mock.patch.object(pbl, "PULL_CACHE_DIR", cache_dir), \
+                mock.patch.object(pbl, "pull_all", return_value=result) as pull_all:
+            out = pbl.pull_all_cached(latitude=1.0, longitude=2.0, target_date=OLD_DATE)
+        pull_all.assert_called_once()
+        return out
+
+    def test_caches_serializable_result(self):
+        cache_dir = Path(self.tmp.name) / "cache"
+        result = _result()
+        self.assertEqual(self._pull(cache_dir, result), result)
+        self.assertEqual(len(list(cache_dir.glob("*.json"))), 1)
+        self.assertEqual(list(cache_dir.glob("*.tmp")), [])
+
+    def test_unserializable_payload_still_returns_and_leaves_no_tmp(self):
+        cache_dir = Path(self.tmp.name) / "cache"
+        result = _result(weather={"values": {1, 2}})
+        self.assertIs(self._pull(cache_dir, result), result)
+        self.assertEqual(list(cache_dir.iterdir()), [])
+
+    def test_unwritable_cache_dir_still_returns(self):
+        # A regular file where the directory should be: mkdir fails even when running as root
+        blocker = Path(self.tmp.name) / "blocker"
+        blocker.write_text("")
+        result = _result()
+        self.assertIs(self._pull(blocker / "cache", result), result)
+
+
+if __name__ == "__main__":
+    unittest.main()
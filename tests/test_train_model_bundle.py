@@ -0,0 +1,45 @@
+"""train_model's saved bundle: its contract, and a joblib round trip that predicts unchanged."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from tests._fakes import ROOT  # noqa: F401  (sets up import paths)
+
+import joblib
+import numpy as np
+
+from apps.ml import train_model
+
+
+class ModelBundleTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n_features = len(train_model.FEATURE_ORDER)
+        self.X = rng.normal(loc=50.0, scale=20.0, size=(200, n_features))
+        y = (self.X[:, 0] + rng.normal(scale=10.0, size=200) > 50).astype(int)
+        self.model = train_model.build_model().fit(self.X, y)
+
+    def test_bundle_contract(self):
+        bundle = train_model.model_bundle(self.model)
+        # The Pipeline scales its own input; a "scaler" key would make loaders scale twice
+        self.assertNotIn("scaler", bundle)
+        self.assertEqual(bundle["model_input"], "raw")
+        self.assertEqual(bundle["feature_order"], train_model.FEATURE_ORDER)
+        self.assertIs(bundle["model"], self.model)
+
+    def test_joblib_round_trip_predicts_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.joblib"
+            joblib.dump(train_model.model_bundle(self.model), path)
+            loaded = joblib.load(path)
+
+        self.assertEqual(loaded["feature_order"], train_model.FEATURE_ORDER)
+        np.testing.assert_array_equal(
+            loaded["model"].predict_proba(self.X), self.model.predict_proba(self.X)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()